@@ -182,6 +182,12 @@ class Game2048App(App):
         )
         parser.add_argument("-i", "--interval", type=int, help="interval between moves")
         parser.add_argument("-p", "--player", type=str, help="player type")
+        parser.add_argument(
+            "--move-time", type=float, help="time budget per move in seconds"
+        )
+        parser.add_argument(
+            "--workers", type=int, help="number of processes searching each move"
+        )
         args = parser.parse_args()
         interval = args.interval or 10
         width = args.cols or 4
@@ -191,6 +197,22 @@ class Game2048App(App):
             # workaround for Kivy won't show the error messags when console is off
             print(f"Invalid player type: {player!r}")
             raise ValueError(f"Invalid player type: {player!r}")
+        # search settings are class attributes of the players that support them
+        player_cls = player_factory.container[player]
+        for option in ("move_time", "workers"):
+            value = getattr(args, option)
+            if value is None:
+                continue
+            if not hasattr(player_cls, option):
+                message = (
+                    f"Player {player!r} does not support --{option.replace('_', '-')}"
+                )
+                print(message)
+                raise ValueError(message)
+            if option == "move_time" and value <= 0:
+                print("--move-time must be positive")
+                raise ValueError("--move-time must be positive")
+            setattr(player_cls, option, value)
         print(f"Starting game with {width}x{height} grid and {player!r} player")
         Window.size = width * 100, height * 100 + 80
         Window.clearcolor = (0.741, 0.678, 0.631, 1.0)
@@ -73,6 +73,8 @@ class Game2048:
 
     def init_game(self):
         """Initialize or reset the game state"""
+        if getattr(self, "player", None) is not None:
+            self.player.close()
         self.grid = Grid2048(self.width, self.height)
         if self.player_type:
             self.player = player_factory.create(self.player_type, self.grid)
@@ -204,12 +206,35 @@ def main():
         help="interval - max frames per second (default: 10, set 0 for unlimited)",
         default=10,
     )
+    parser.add_argument(
+        "--move-time",
+        type=float,
+        help="time budget per move in seconds for the search players (e.g., expectimax)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="number of processes searching each move (e.g., expectimax)",
+    )
     args = parser.parse_args()
     if args.player and args.player not in player_factory.container:
         print(f"Invalid player type: {args.player!r}")
         sys.exit(1)
 
     player = args.player or "user"
+    # search settings are class attributes of the players that support them
+    player_cls = player_factory.container[player]
+    for option in ("move_time", "workers"):
+        value = getattr(args, option)
+        if value is None:
+            continue
+        if not hasattr(player_cls, option):
+            print(f"Player {player!r} does not support --{option.replace('_', '-')}")
+            sys.exit(1)
+        if option == "move_time" and value <= 0:
+            print("--move-time must be positive")
+            sys.exit(1)
+        setattr(player_cls, option, value)
     game = Game2048(args.cols, args.rows, player, args.fps)
     game.run()
 
@@ -3,12 +3,16 @@ import argparse
 
 import csv
 import os
+import random
 import time
 from datetime import datetime
 import multiprocessing
 
-from grid2048 import Grid2048, helpers
-from grid2048.hasher import Hasher
+import numpy as np
+
+from grid2048 import Bitboard2048, Grid2048, helpers
+from grid2048.grid2048 import VALUES
+from grid2048.hasher import Hasher, decode, format_key
 from players import player_factory
 
 # disable user player for stats
@@ -28,13 +32,23 @@ class Stats:
     -i ITER, --iter ITER  number of iterations
     -f FILE, --file FILE  stats file
     -o OPEN, --open OPEN  open and show stats
+    -b, --bitboard        use the packed bitboard grid
+    -s SEED, --seed SEED  seed for reproducible games
     """
 
     stats_dir = "stats"
     fields = ["player", "score", "max_tile", "moves", "time", "grid"]
 
-    def __init__(self, player: str | None = None, filename: str | None = None) -> None:
+    def __init__(
+        self,
+        player: str | None = None,
+        filename: str | None = None,
+        bitboard: bool = False,
+        seed: int | None = None,
+    ) -> None:
         self.player = player
+        self.grid_cls = Bitboard2048 if bitboard else Grid2048
+        self.seed = seed
         if not filename:
             self.filename = self._get_filename(player)
             return
@@ -70,6 +84,12 @@ class Stats:
             reader = csv.DictReader(f)
             return [dict(r) for r in reader]
 
+    def load_boards(self, stats: list) -> np.ndarray:
+        """Return the final boards of the loaded stats
+        as an (N, height, width) array of tile values.
+        Files written before the keys got their 0x prefix are read as well."""
+        return VALUES[decode([s["grid"] for s in stats])]
+
     def print_stats(self, stats: list) -> None:
         """Print stats to console"""
         print(f"Total games: {len(stats):>9}")
@@ -115,7 +135,10 @@ class Stats:
         if not self.player:
             raise ValueError("Player type not specified.")
         stime = time.time()
-        grid = Grid2048(WIDTH, HEIGHT)
+        # every game gets its own seed, so results don't depend on the worker
+        seed = None if self.seed is None else self.seed + iteration
+        random.seed(seed)
+        grid = self.grid_cls(WIDTH, HEIGHT, seed=seed)
         player = player_factory.create(self.player, grid)
         while not grid.no_moves:
             print("\t" * (iteration), f"{iteration+1}:{grid.score}", end="\r")
@@ -126,14 +149,13 @@ class Stats:
         return
 
     def process_stats(self, iteration: int, grid: Grid2048, etime: float) -> None:
-        h = Hasher(grid)
         stat = {
             "player": self.player,
             "score": grid.score,
             "max_tile": helpers.max_tile(grid),
             "moves": grid.moves,
             "time": etime,
-            "grid": h.hash(),
+            "grid": format_key(Hasher(grid).key()),
         }
         self.save_stats(stat)
         print(grid)
@@ -143,7 +165,7 @@ class Stats:
         )
 
 
-def parse_cmd_args() -> tuple[str, int, int, str | None, str | None]:
+def parse_cmd_args() -> tuple[str, int, int, str | None, str | None, bool, int | None]:
     """Parse command line arguments"""
     parser = argparse.ArgumentParser()
     parser.add_argument("-p", "--player", type=str, help="player type")
@@ -151,6 +173,10 @@ def parse_cmd_args() -> tuple[str, int, int, str | None, str | None]:
     parser.add_argument("-f", "--file", type=str, help="stats file")
     parser.add_argument("-o", "--open", type=str, help="open and show stats")
     parser.add_argument("-c", "--cores", type=str, help="how many cores to use")
+    parser.add_argument(
+        "-b", "--bitboard", action="store_true", help="use the packed bitboard grid"
+    )
+    parser.add_argument("-s", "--seed", type=int, help="seed for reproducible games")
     args = parser.parse_args()
     player = args.player or "random"
     if player not in player_factory.container:
@@ -159,11 +185,11 @@ def parse_cmd_args() -> tuple[str, int, int, str | None, str | None]:
     fopen = args.open
     iterations = int(args.iter or 10)
     cores = int(args.cores) if args.cores else multiprocessing.cpu_count() // 2
-    return (player, iterations, cores, ffile, fopen)
+    return (player, iterations, cores, ffile, fopen, args.bitboard, args.seed)
 
 
 def main() -> None:
-    player, iterations, cores, ffile, fopen = parse_cmd_args()
+    player, iterations, cores, ffile, fopen, bitboard, seed = parse_cmd_args()
 
     if fopen:  # Show stats from file
         stats = Stats(filename=fopen)
@@ -173,7 +199,7 @@ def main() -> None:
     print(
         f"Starting {iterations} games with {WIDTH}x{HEIGHT} grid and {player!r} player"
     )
-    stats = Stats(player, ffile)
+    stats = Stats(player, ffile, bitboard, seed)
     # TODO: refactor this
     with multiprocessing.Pool(cores) as pool:
         pool.map(stats.run, range(iterations))
@@ -1 +1,3 @@
-from .grid2048 import DIRECTION, STATE, Grid2048, Move, MoveFactory
+from .grid2048 import DIRECTION, STATE, Grid2048, Move, MoveFactory, Preview
+from .bitboard import Bitboard2048
+from .batch import BatchGrid2048
@@ -0,0 +1,158 @@
+"""BatchGrid2048 module. Plays many 2048 games at once with NumPy."""
+
+from typing import Iterable
+
+import numpy as np
+
+from .grid2048 import DIRECTION, VALUES, Grid2048, to_exponents
+from .tables import lookup
+
+
+class BatchGrid2048:
+    """Stack of N independent 2048 grids stored in a (N, height, width) array
+    of uint8 tile exponents.
+    Every operation is applied to all the boards in a single vectorized step."""
+
+    def __init__(self, count: int, width=4, height=4, seed=None):
+        if count <= 0:
+            raise ValueError("Batch size must be positive")
+        if width <= 0 or height <= 0:
+            raise ValueError("Grid dimensions must be positive")
+        self.count = count
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self._grid = np.array([])
+        self.reset()
+
+    @classmethod
+    def from_grid(cls, grid: Grid2048, count: int, seed=None) -> "BatchGrid2048":
+        """Create a batch of copies of the given grid"""
+        batch = cls(count, grid.width, grid.height, seed)
+        batch._grid = np.broadcast_to(grid.exponents, batch._grid.shape).copy()
+        batch.score[:] = grid.score
+        batch.moves[:] = grid.moves
+        return batch
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"BatchGrid2048({self.count}, {self.width}, {self.height})"
+
+    def __getitem__(self, key):
+        return VALUES[self._grid[key]]
+
+    @property
+    def data(self) -> np.ndarray:
+        """Return a copy of the boards as tile values"""
+        return VALUES[self._grid]
+
+    @property
+    def exponents(self) -> np.ndarray:
+        """Return the tile exponents of the boards (0 for empty cells)"""
+        return self._grid
+
+    @data.setter
+    def data(self, value: np.ndarray) -> None:
+        if not isinstance(value, np.ndarray):
+            raise TypeError("Grid data must be a numpy array of integers")
+        if value.shape != (self.count, self.height, self.width):
+            raise ValueError(
+                f"Invalid batch dimensions: {(self.count, self.height, self.width)} != {value.shape}"
+            )
+        if not np.issubdtype(value.dtype, np.integer):
+            raise TypeError("Grid values must be integers")
+        self._grid = to_exponents(value)
+
+    def reset(self) -> None:
+        """Reset all the grids"""
+        self._grid = np.zeros((self.count, self.height, self.width), dtype=np.uint8)
+        self.score = np.zeros(self.count, dtype=np.int64)
+        self.moves = np.zeros(self.count, dtype=np.int64)
+        self.add_random_tiles()
+        self.add_random_tiles()
+
+    def to_grid(self, index: int) -> Grid2048:
+        """Return a copy of one of the boards as a Grid2048"""
+        grid = Grid2048(self.width, self.height)
+        grid.data = self[index]
+        grid.score = int(self.score[index])
+        grid.moves = int(self.moves[index])
+        return grid
+
+    def empty_counts(self) -> np.ndarray:
+        """Return the number of empty fields of every board"""
+        return np.count_nonzero(self._grid == 0, axis=(1, 2))
+
+    def add_random_tiles(self, mask: np.ndarray | None = None) -> None:
+        """Add a random tile to every board (or to the boards selected by mask)"""
+        flat = self._grid.reshape(self.count, -1)
+        empty = flat == 0
+        if mask is not None:
+            empty &= np.asarray(mask, dtype=bool)[:, None]
+        # the empty cell with the highest random key is a uniform choice
+        keys = np.where(empty, self.rng.random(empty.shape), -1.0)
+        cells = np.argmax(keys, axis=1)
+        boards = np.flatnonzero(empty.any(axis=1))
+        exps = np.where(self.rng.random(len(boards)) < 0.9, 1, 2)
+        flat[boards, cells[boards]] = exps
+
+    @property
+    def no_moves(self) -> np.ndarray:
+        """Return a mask of the boards that have no moves left"""
+        grid = self._grid
+        return ~(
+            (grid == 0).any(axis=(1, 2))
+            | (grid[:, 1:, :] == grid[:, :-1, :]).any(axis=(1, 2))
+            | (grid[:, :, 1:] == grid[:, :, :-1]).any(axis=(1, 2))
+        )
+
+    def move(
+        self,
+        directions: DIRECTION | Iterable[DIRECTION] | np.ndarray,
+        add_tile: bool = True,
+    ) -> np.ndarray:
+        """Move every board in its own direction and return a mask of valid moves.
+        Directions can be a single DIRECTION, a sequence of them, or an array
+        of DIRECTION values."""
+        codes = self._direction_codes(directions)
+        exps = self._grid
+        valid = np.zeros(self.count, dtype=bool)
+        for direction in DIRECTION:
+            boards = np.flatnonzero(codes == direction.value)
+            if not len(boards):
+                continue
+            rows = exps[boards]
+            if direction in (DIRECTION.UP, DIRECTION.DOWN):
+                rows = rows.transpose(0, 2, 1)
+            reverse = direction in (DIRECTION.RIGHT, DIRECTION.DOWN)
+            new, score, changed = lookup(rows, reverse)
+            if direction in (DIRECTION.UP, DIRECTION.DOWN):
+                new = new.transpose(0, 2, 1)
+            self._grid[boards] = new
+            self.score[boards] += score.sum(axis=1, dtype=np.int64)
+            valid[boards] = changed.any(axis=1)
+        self.moves += valid
+        if add_tile:
+            self.add_random_tiles(valid)
+        return valid
+
+    def _direction_codes(self, directions) -> np.ndarray:
+        """Convert the directions (DIRECTION members or their values)
+        to an array of DIRECTION values"""
+        if isinstance(directions, DIRECTION):
+            return np.full(self.count, directions.value)
+        directions = np.array(
+            [d.value if isinstance(d, DIRECTION) else d for d in directions]
+        )
+        if directions.shape != (self.count,):
+            raise ValueError(
+                f"Expected {self.count} directions, got {directions.shape}"
+            )
+        if (
+            not np.issubdtype(directions.dtype, np.integer)
+            or ((directions < 1) | (directions > 4)).any()
+        ):
+            raise ValueError("Directions must be DIRECTION members or values 1 to 4")
+        return directions
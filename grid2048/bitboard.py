@@ -0,0 +1,349 @@
+"""Bitboard2048 module. A 4x4 grid packed into a single 64-bit integer.
+
+Every cell holds the exponent of its tile in 4 bits (0 for an empty cell),
+so the whole board fits into one Python int. Moves are played through
+precomputed 65536-entry tables indexed by a packed row, which makes the
+board much cheaper to copy and move than the NumPy based Grid2048.
+Tiles are capped at 32768 (exponent 15).
+"""
+
+from copy import copy
+from typing import Any
+
+import numpy as np
+
+from .grid2048 import (
+    DIRECTION,
+    STATE,
+    VALUES,
+    Grid2048,
+    Move,
+    MoveFactory,
+    Preview,
+    Spawner,
+    to_exponents,
+)
+from .tables import get_row_table
+
+ROW_MASK = 0xFFFF
+COL_MASK = 0x000F_000F_000F_000F
+_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+# masks over 16 cells of one byte each, used to pack bytes into nibbles
+_HIGH_NIBBLES = int.from_bytes(b"\xf0" * 16, "little")
+_PACK_MASKS = (
+    (4, int.from_bytes(b"\xff\x00" * 8, "little")),
+    (8, int.from_bytes(b"\xff\xff\x00\x00" * 4, "little")),
+    (
+        16,
+        int.from_bytes(b"\xff" * 4 + b"\x00" * 4 + b"\xff" * 4 + b"\x00" * 4, "little"),
+    ),
+    (32, 0xFFFF_FFFF_FFFF_FFFF),
+)
+
+_tables: tuple[list[int], ...] = ()
+
+
+def _get_tables() -> tuple[list[int], ...]:
+    """Return the transition tables, building them on first use.
+    Up/down results are spread into a column of the board."""
+    global _tables  # pylint: disable=global-statement
+    if not _tables:
+        table = get_row_table(4)
+        left = table.left.astype(np.uint64)
+        right = table.right.astype(np.uint64)
+        _tables = (
+            left.tolist(),
+            right.tolist(),
+            _unpack_col(left).tolist(),
+            _unpack_col(right).tolist(),
+            table.score_left.tolist(),
+            table.score_right.tolist(),
+        )
+    return _tables
+
+
+def _unpack_col(row: np.ndarray) -> np.ndarray:
+    """Spread packed rows into a column of the board"""
+    return (row | (row << 12) | (row << 24) | (row << 36)) & COL_MASK
+
+
+def _unpack(board: int) -> np.ndarray:
+    """Unpack the board into a 4x4 numpy array of tile exponents"""
+    exps = (np.uint64(board) >> _SHIFTS) & np.uint64(0xF)
+    return exps.astype(np.uint8).reshape(4, 4)
+
+
+def pack_board(exps: np.ndarray) -> int:
+    """Pack a 4x4 uint8 array of tile exponents into a board.
+    Raises ValueError if an exponent doesn't fit into 4 bits."""
+    board = int.from_bytes(exps.tobytes(), "little")
+    if board & _HIGH_NIBBLES:
+        raise ValueError("Tiles above 32768 can't be packed")
+    for shift, mask in _PACK_MASKS:
+        board = (board | (board >> shift)) & mask
+    return board
+
+
+def transpose(board: int) -> int:
+    """Transpose the packed board (swap rows with columns)"""
+    a1 = board & 0xF0F0_0F0F_F0F0_0F0F
+    a2 = board & 0x0000_F0F0_0000_F0F0
+    a3 = board & 0x0F0F_0000_0F0F_0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00_FF00_00FF_00FF
+    b2 = a & 0x00FF_00FF_0000_0000
+    b3 = a & 0x0000_0000_FF00_FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def count_empty(board: int) -> int:
+    """Return the number of empty cells on the packed board"""
+    board |= (board >> 2) & 0x3333_3333_3333_3333
+    board |= board >> 1
+    board = ~board & 0x1111_1111_1111_1111
+    return board.bit_count()
+
+
+def shift(board: int, direction: DIRECTION) -> tuple[int, int]:
+    """Shift the packed board in the given direction.
+    Returns the new board and the score of the move."""
+    left, right, up, down, score_left, score_right = _get_tables()
+    result = 0
+    score = 0
+    if direction == DIRECTION.LEFT or direction == DIRECTION.RIGHT:
+        table, scores = (
+            (left, score_left) if direction == DIRECTION.LEFT else (right, score_right)
+        )
+        for i in range(0, 64, 16):
+            row = (board >> i) & ROW_MASK
+            result |= table[row] << i
+            score += scores[row]
+    else:
+        table, scores = (
+            (up, score_left) if direction == DIRECTION.UP else (down, score_right)
+        )
+        t = transpose(board)
+        for i in range(4):
+            row = (t >> (16 * i)) & ROW_MASK
+            result |= table[row] << (4 * i)
+            score += scores[row]
+    return result, score
+
+
+class Bitboard2048:
+    """4x4 2048 grid stored as a packed 64-bit integer.
+    Exposes the same interface as Grid2048, so it can be used with the players."""
+
+    def __init__(self, width=4, height=4, seed=None):
+        if width != 4 or height != 4:
+            raise ValueError("Bitboard2048 supports only 4x4 grids")
+        self.state = STATE.IDLE
+        self.spawner = Spawner(seed)
+        self._last_move: Move | tuple | None = None  # or (direction, score, changed)
+        self.width = width
+        self.height = height
+        self.board = 0
+        self._data = (-1, np.array([]))
+        self._no_moves = (-1, False)
+        self._journal: list[tuple[int, int, int]] = []
+        self.reset()
+
+    __str__ = Grid2048.__str__
+
+    def __repr__(self):
+        return f"Bitboard2048({self.width}, {self.height}): {self.board:#018x}"
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        if not isinstance(value, (int, np.integer)):
+            raise TypeError("Grid values must be integers")
+        data = self.data.copy()
+        data[key] = value
+        self.data = data
+
+    def __eq__(self, other):
+        if not isinstance(other, Bitboard2048):
+            return False
+        return self.board == other.board
+
+    def __deepcopy__(self, memo):
+        clone = object.__new__(Bitboard2048)
+        clone.__dict__.update(self.__dict__)
+        clone._last_move = copy(self._last_move)
+        clone._journal = self._journal.copy()
+        clone.spawner = self.spawner.fork()
+        memo[id(self)] = clone
+        return clone
+
+    @property
+    def data(self) -> np.ndarray:
+        """Return the grid as a read-only numpy array of tile values.
+        The array is cached until the board changes."""
+        board, data = self._data
+        if board != self.board:
+            data = VALUES[_unpack(self.board)]
+            data.flags.writeable = False
+            self._data = (self.board, data)
+        return data
+
+    @property
+    def exponents(self) -> np.ndarray:
+        """Return the grid as a numpy array of tile exponents (0 for empty cells)"""
+        return _unpack(self.board)
+
+    @data.setter
+    def data(self, value: np.ndarray) -> None:
+        if not isinstance(value, np.ndarray):
+            raise TypeError("Grid data must be a numpy array of integers")
+        if value.shape != (self.height, self.width):
+            raise ValueError(
+                f"Invalid grid dimensions: {self.width}x{self.height} != {value.shape}"
+            )
+        if not np.issubdtype(value.dtype, np.integer):
+            raise TypeError("Grid values must be integers")
+        self.board = pack_board(to_exponents(value))
+
+    @property
+    def zobrist(self) -> int:
+        """Return a 64-bit hash of the tiles.
+        The packed board itself is a unique key, so it is used as the hash."""
+        return self.board
+
+    @property
+    def last_move(self) -> Move:
+        if self._last_move is None:
+            raise ValueError("No move has been made yet")
+        if isinstance(self._last_move, tuple):
+            self._last_move = MoveFactory.from_result(*self._last_move)
+        return self._last_move
+
+    def reset(self) -> None:
+        """Reset the grid"""
+        self.board = 0
+        self._journal = []
+        self.score = 0
+        self.moves = 0
+        self.add_random_tile()
+        self.add_random_tile()
+        self.state = STATE.IDLE
+
+    @property
+    def empty_count(self) -> int:
+        """Return the number of empty fields"""
+        return count_empty(self.board)
+
+    @property
+    def empty_cells(self) -> np.ndarray:
+        """Return the flat indices of the empty fields"""
+        return np.flatnonzero(self.data.ravel() == 0)
+
+    def get_empty_fields(self) -> list[tuple[Any]]:
+        """Return a list of tuples containing the coordinates of empty fields"""
+        board = self.board
+        return [divmod(i, 4) for i in range(16) if not (board >> (4 * i)) & 0xF]
+
+    def add_random_tile(self, empty_fields: list | None = None) -> None:
+        """Add a random tile to the grid.
+        Picks one of the given empty fields or, by default, any empty field."""
+        if empty_fields is None:
+            empty_fields = self.get_empty_fields()
+        if empty_fields:
+            index, value = self.spawner.draw(len(empty_fields))
+            row, col = empty_fields.pop(index)
+            self.board |= (value >> 1) << (16 * row + 4 * col)
+
+    def put_random_tile(self, row: int, col: int) -> None:
+        """Put a random tile at the given coordinates"""
+        if not 0 <= row < self.height or not 0 <= col < self.width:
+            raise ValueError("Invalid coordinates")
+        if (self.board >> (16 * row + 4 * col)) & 0xF:
+            raise ValueError("Cell is not empty")
+        self.board |= (self.spawner.draw(1)[1] >> 1) << (16 * row + 4 * col)
+
+    def preview(self, direction: DIRECTION) -> Preview:
+        """Return the result of a move in the given direction
+        without changing the grid"""
+        board, score = shift(self.board, direction)
+        return Preview(direction, VALUES[_unpack(board)], score, board != self.board)
+
+    def successors(self) -> list[Preview]:
+        """Return the previews of the moves in all directions"""
+        return [self.preview(direction) for direction in DIRECTION]
+
+    def make_move(self, direction: DIRECTION) -> bool:
+        """Execute a move in place without adding a tile and record it
+        in the journal, so it can be reverted with unmake().
+        Returns True if the move is valid, invalid moves are not recorded."""
+        board, score = shift(self.board, direction)
+        if board == self.board:
+            return False
+        self._journal.append((self.board, score, 1))
+        self.board = board
+        self.score += score
+        self.moves += 1
+        return True
+
+    def make_tile(self, row: int, col: int, value: int | None = None) -> None:
+        """Put a tile (random if value is None) at the given coordinates
+        and record it in the journal, so it can be reverted with unmake()."""
+        if not 0 <= row < self.height or not 0 <= col < self.width:
+            raise ValueError("Invalid coordinates")
+        board = self.board
+        if value is None:
+            self.put_random_tile(row, col)
+        else:
+            value = int(value)
+            if value < 2 or value & (value - 1) or value > 1 << 15:
+                raise ValueError(f"Invalid tile value: {value}")
+            if (board >> (16 * row + 4 * col)) & 0xF:
+                raise ValueError("Cell is not empty")
+            self.board |= (value.bit_length() - 1) << (16 * row + 4 * col)
+        self._journal.append((board, 0, 0))
+
+    def unmake(self) -> None:
+        """Revert the last change recorded in the journal"""
+        if not self._journal:
+            raise ValueError("Nothing to unmake")
+        board, score, moves = self._journal.pop()
+        self.board = board
+        self.score -= score
+        self.moves -= moves
+
+    @property
+    def no_moves(self) -> bool:
+        """Check if there are any moves left.
+        The result is cached until the board changes."""
+        board, no_moves = self._no_moves
+        if board != self.board:
+            no_moves = not count_empty(self.board) and (
+                shift(self.board, DIRECTION.LEFT)[0] == self.board
+                and shift(self.board, DIRECTION.UP)[0] == self.board
+            )
+            self._no_moves = (self.board, no_moves)
+        return no_moves
+
+    def move(self, move: Move | DIRECTION, add_tile: bool = True) -> bool:
+        """Execute a move and return True if the move is valid.
+        The move can be given as a Move or directly as a DIRECTION."""
+        if self.state == STATE.RUNNING or self.no_moves:
+            return False
+        self.state = STATE.RUNNING
+        direction = move if isinstance(move, DIRECTION) else move.direction
+        board, score = shift(self.board, direction)
+        changed = board != self.board
+        self.board = board
+        if isinstance(move, DIRECTION):
+            # the Move is only created if last_move is asked for
+            self._last_move = (move, score, changed)
+        else:
+            move.record(score, changed)
+            self._last_move = move
+        self.score += score
+        if changed:
+            self.moves += 1
+            if add_tile:
+                self.add_random_tile()
+        self.state = STATE.IDLE
+        return changed
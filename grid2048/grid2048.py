@@ -1,14 +1,166 @@
 """Grid2048 module. Contains the Grid2048 class and the Move class."""
 
+from copy import copy
 from enum import Enum
-from random import choice, choices
-from typing import Any, Callable
+from typing import Any, Callable, NamedTuple
 
 import numpy as np
 
+from .tables import shift_rows
+
 STATE = Enum("STATE", "IDLE RUNNING")
 DIRECTION = Enum("DIRECTION", "UP DOWN LEFT RIGHT")
 
+# (transpose, reverse) of the grid rows for every direction
+ORIENTATION = {
+    DIRECTION.UP: (True, False),
+    DIRECTION.DOWN: (True, True),
+    DIRECTION.LEFT: (False, False),
+    DIRECTION.RIGHT: (False, True),
+}
+
+
+# tile value of every exponent, 0 stands for an empty cell
+VALUES = np.array([0] + [1 << e for e in range(1, 63)], dtype=np.int64)
+
+
+def to_exponents(values: np.ndarray) -> np.ndarray:
+    """Convert tile values to uint8 exponents (0 for empty cells).
+    Raises ValueError if a value is not 0 or a power of two above 1."""
+    values = np.asarray(values)
+    if ((values < 0) | (values == 1) | (values & (values - 1) != 0)).any():
+        raise ValueError("Grid values must be 0 or powers of two")
+    return (np.frexp(values)[1] - 1).clip(0).astype(np.uint8)
+
+
+_ZOBRIST: dict[int, list[list[int]]] = {}
+
+
+def zobrist_table(size: int) -> list[list[int]]:
+    """Return the random 64-bit keys of every cell and exponent
+    of a grid with the given number of cells. Empty cells have the key 0.
+    The keys are drawn from a fixed seed, so they are the same in every process.
+    They are kept as Python ints, which are faster to look up one by one."""
+    table = _ZOBRIST.get(size)
+    if table is None:
+        rng = np.random.default_rng(2048)
+        keys = rng.integers(
+            0, 2**64 - 1, (size, len(VALUES)), dtype=np.uint64, endpoint=True
+        )
+        keys[:, 0] = 0
+        table = _ZOBRIST[size] = keys.tolist()
+    return table
+
+
+class Preview(NamedTuple):
+    """Result of a move computed without changing the grid"""
+
+    direction: DIRECTION
+    data: np.ndarray
+    score: int
+    is_valid: bool
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(state: int) -> tuple[int, int]:
+    """Advance a SplitMix64 state and return it with the next 64-bit output"""
+    state = (state + 0x9E37_79B9_7F4A_7C15) & _MASK64
+    z = ((state ^ (state >> 30)) * 0xBF58_476D_1CE4_E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D0_49BB_1331_11EB) & _MASK64
+    return state, z ^ (z >> 31)
+
+
+class Spawner:
+    """Source of random tile spawns for a grid.
+    Positions and values are drawn from buffers that are refilled
+    in batches from a numpy Generator, so games can be seeded.
+    Forked spawners of the search copies only keep a 64-bit SplitMix64
+    state seeded by their parent, so copies are cheap to make and to spawn on."""
+
+    buffer_size = 256
+
+    def __init__(self, seed: "int | np.random.Generator | Spawner | None" = None):
+        # the generator is created on first use, so spawners that never
+        # spawn a tile don't pay for it
+        self._seed = seed
+        self._rng: np.random.Generator | None = None
+        self._state: int | None = None  # SplitMix64 state of a forked spawner
+        self._fork_state: int | None = None  # seeds the children
+        if isinstance(seed, Spawner):
+            self._state = seed._next_fork()
+            self._fork_state = self._state ^ 0x5851_F42D_4C95_7F2D
+            self._seed = None
+        self._uniform: list[float] = []
+        self._values: list[int] = []
+        self._pos = 0
+
+    @property
+    def rng(self) -> np.random.Generator:
+        """Return the generator of a spawner that is not a fork"""
+        if self._rng is None:
+            self._rng = np.random.default_rng(self._seed)
+        return self._rng
+
+    def _next_fork(self) -> int:
+        """Return the seed of a new child spawner"""
+        if self._fork_state is None:
+            seed_seq = self.rng.bit_generator.seed_seq  # type: ignore
+            self._fork_state = int(seed_seq.generate_state(1, np.uint64)[0])
+        self._fork_state, seed = _splitmix64(self._fork_state)
+        return seed
+
+    def _fill(self) -> None:
+        """Pre-draw a batch of positions and tile values"""
+        self._uniform = self.rng.random(self.buffer_size).tolist()
+        self._values = np.where(self.rng.random(self.buffer_size) < 0.9, 2, 4).tolist()
+        self._pos = 0
+
+    def draw(self, count: int) -> tuple[int, int]:
+        """Return a random index below count and a random tile value (2 or 4)"""
+        if self._state is not None:
+            self._state, bits = _splitmix64(self._state)
+            # the high 53 bits pick the index, the low 16 bits the value
+            index = int((bits >> 11) * count / 2**53)
+            return index, 4 if bits & 0xFFFF < 6554 else 2
+        if self._pos == len(self._values):
+            self._fill()
+        pos = self._pos
+        self._pos += 1
+        return int(self._uniform[pos] * count), self._values[pos]
+
+    def fork(self) -> "Spawner":
+        """Return an independent spawner derived from this one.
+        The stream of this spawner is not advanced."""
+        return Spawner(self)
+
+
+class Undo(NamedTuple):
+    """Compact record of a change made to the grid, used to revert it"""
+
+    cells: np.ndarray  # flat indices of the changed cells
+    values: np.ndarray  # previous exponents of the changed cells
+    score: int
+    moves: int
+
+
+def _shift_view(rows: np.ndarray, reverse: bool) -> tuple[int, bool]:
+    """Shift the rows of a view of exponents in place using the row tables.
+    Columns are shifted by passing a transposed view.
+    Returns the score and whether the view has changed."""
+    new, score, changed = shift_rows(rows, reverse)
+    if changed:
+        rows[...] = new
+    return score, changed
+
+
+def shift(data: np.ndarray, direction: DIRECTION) -> tuple[int, bool]:
+    """Shift a grid of exponents in place in the given direction.
+    Returns the score of the move and whether the grid has changed."""
+    transpose, reverse = ORIENTATION[direction]
+    return _shift_view(data.T if transpose else data, reverse)
+
 
 class Move:
     """Move class. Makes a move in a given direction."""
@@ -23,11 +175,25 @@ class Move:
 
     def __call__(self, grid: "Grid2048") -> "Grid2048":
         """Execute the move"""
+        self.reset()
         self.dir_fn(self, grid)
         self._called = True
         self._is_valid = self._changed
         return grid
 
+    def reset(self) -> None:
+        """Clear the result of the previous call, so the move can be reused"""
+        self.score = 0
+        self._called = False
+        self._is_valid = False
+        self._changed = False
+
+    def record(self, score: int, changed: bool) -> None:
+        """Store the result of a move executed by a direction kernel"""
+        self.score = score
+        self._called = True
+        self._is_valid = self._changed = changed
+
     @property
     def direction(self) -> DIRECTION:
         """Return the direction of the move"""
@@ -42,72 +208,34 @@ class Move:
 
     def shift_up(self, grid: "Grid2048") -> "Grid2048":
         """Shift the grid up combining tiles"""
-        matrix = grid.data
-        for col in range(len(matrix[0])):
-            # Create a temporary list to store the non-zero tiles
-            lst = np.copy(matrix[:, col])
-            temp = list(lst[lst != 0])
-            # Combine the tiles
-            self.score += self.combine_tiles(temp)
-            # Rebuild the column
-            if temp:
-                matrix[:, col] = 0
-                matrix[: len(temp), col] = temp
-            if lst.tolist() != matrix[:, col].tolist():
-                self._changed = True
+        self._shift_rows(grid, DIRECTION.UP)
         return grid
 
     def shift_down(self, grid: "Grid2048") -> "Grid2048":
         """Shift the grid down combining tiles"""
-        matrix = grid.data
-        for col in range(len(matrix[0])):
-            # Create a temporary list to store the non-zero tiles
-            lst = np.copy(matrix[::-1, col])
-            temp = list(lst[lst != 0])
-            # Combine the tiles
-            self.score += self.combine_tiles(temp)
-            # Rebuild the column
-            if temp:
-                matrix[::-1, col] = 0
-                matrix[-len(temp) :, col] = temp[::-1]
-            if lst.tolist() != matrix[::-1, col].tolist():
-                self._changed = True
+        self._shift_rows(grid, DIRECTION.DOWN)
         return grid
 
     def shift_left(self, grid: "Grid2048") -> "Grid2048":
         """Shift the grid left combining tiles"""
-        matrix = grid.data
-        for col in range(matrix.shape[0]):
-            # Create a temporary list to store the non-zero tiles
-            lst = np.copy(matrix[col, :])
-            temp = list(lst[lst != 0])
-            # Combine the tiles
-            self.score += self.combine_tiles(temp)
-            # Rebuild the column
-            if temp:
-                matrix[col, :] = 0
-                matrix[col, : len(temp)] = temp
-            if lst.tolist() != matrix[col, :].tolist():
-                self._changed = True
+        self._shift_rows(grid, DIRECTION.LEFT)
         return grid
 
     def shift_right(self, grid: "Grid2048") -> "Grid2048":
         """Shift the grid right combining tiles"""
-        matrix = grid.data
-        for col in range(matrix.shape[0]):
-            # Create a temporary list to store the non-zero tiles
-            lst = np.copy(matrix[col, ::-1])
-            temp = list(lst[lst != 0])
-            # Combine the tiles
-            self.score += self.combine_tiles(temp)
-            # Rebuild the column
-            if temp:
-                matrix[col, :] = 0
-                matrix[col, -len(temp) :] = temp[::-1]
-            if lst.tolist() != matrix[col, ::-1].tolist():
-                self._changed = True
+        self._shift_rows(grid, DIRECTION.RIGHT)
         return grid
 
+    def _shift_rows(self, grid: "Grid2048", direction: DIRECTION) -> None:
+        """Shift the grid in place, update its hash and caches
+        and record the result"""
+        old = grid._grid.copy()
+        score, changed = shift(grid._grid, direction)
+        if changed:
+            grid._update_from(old)
+        self._changed = self._changed or changed
+        self.score += score
+
     def combine_tiles(self, temp: list[int]) -> int:
         """Combine the tiles and count the score"""
         i = 0
@@ -124,23 +252,29 @@ class Move:
 class Grid2048:
     """2048 grid class"""
 
-    def __init__(self, width=4, height=4):
+    def __init__(self, width=4, height=4, seed=None):
         if width <= 0 or height <= 0:
             raise ValueError("Grid dimensions must be positive")
         self.state = STATE.IDLE
-        self._last_move = None
+        self.spawner = Spawner(seed)
+        self._last_move: Move | tuple | None = None  # or (direction, score, changed)
+        self._journal: list[Undo] = []
+        self._no_moves: bool | None = None
+        self._values: np.ndarray | None = None
+        self._zobrist = 0
         self.width = width
         self.height = height
         self._grid = np.array([])
+        self._empty: np.ndarray | None = None  # flat indices of the empty cells
         self.reset()
 
     def __str__(self):
         # Find the length of the longest number
-        val = np.max(self._grid)
+        val = np.max(self.data)
         # Create the string
         l = len(str(val))
         s = "\n" + "-" * (l + 1) * self.width + "-\n"
-        for row in self._grid:
+        for row in self.data:
             s += "|"
             for tile in row:
                 strtile = f"{tile: ^{l}}" if tile > 0 else " "
@@ -149,15 +283,29 @@ class Grid2048:
         return s
 
     def __repr__(self):
-        return f"Grid2048({self.width}, {self.height}): {self._grid}"
+        return f"Grid2048({self.width}, {self.height}): {self.data}"
 
     def __getitem__(self, key):
-        return self._grid[key]
+        return self.data[key]
 
     def __setitem__(self, key, value):
         if not isinstance(value, (int, np.integer)):
             raise TypeError("Grid values must be integers")
-        self._grid[key] = value
+        self._grid[key] = to_exponents(value)
+        self._rebuild()
+
+    def __deepcopy__(self, memo):
+        # copies get their own spawn stream, so searching on a copy
+        # does not change the tiles spawned in the original game
+        clone = object.__new__(type(self))
+        memo[id(self)] = clone
+        # the journal records and the cached arrays are never changed in place
+        clone.__dict__.update(self.__dict__)
+        clone._grid = self._grid.copy()
+        clone._journal = self._journal.copy()
+        clone._last_move = copy(self._last_move)
+        clone.spawner = self.spawner.fork()
+        return clone
 
     def __eq__(self, other):
         if not isinstance(other, Grid2048):
@@ -170,12 +318,32 @@ class Grid2048:
 
     @property
     def data(self) -> np.ndarray:
-        return self._grid
+        """Return the grid as a read-only array of tile values.
+        The array is cached until the grid changes."""
+        if self._values is None:
+            self._values = VALUES[self._grid]
+            self._values.flags.writeable = False
+        return self._values
+
+    @property
+    def exponents(self) -> np.ndarray:
+        """Return a read-only view of the tile exponents (0 for empty cells)"""
+        view = self._grid.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def zobrist(self) -> int:
+        """Return the 64-bit Zobrist hash of the tiles.
+        It is updated incrementally as the grid changes."""
+        return self._zobrist
 
     @property
     def last_move(self) -> Move:
         if self._last_move is None:
             raise ValueError("No move has been made yet")
+        if isinstance(self._last_move, tuple):
+            self._last_move = MoveFactory.from_result(*self._last_move)
         return self._last_move
 
     @data.setter
@@ -188,28 +356,87 @@ class Grid2048:
             )
         if not np.issubdtype(value.dtype, np.integer):
             raise TypeError("Grid values must be integers")
-        self._grid = value
+        self._grid = to_exponents(value)
+        self._rebuild()
+
+    def _invalidate(self) -> None:
+        """Drop the cached state after the grid has changed"""
+        self._no_moves = None
+        self._values = None
+        self._empty = None
+
+    def _rebuild(self) -> None:
+        """Rebuild the hash from scratch"""
+        flat = self._grid.ravel()
+        table = zobrist_table(flat.size)
+        self._zobrist = 0
+        for cell, exp in enumerate(flat.tolist()):
+            self._zobrist ^= table[cell][exp]
+        self._invalidate()
+
+    def _update(self, cells: np.ndarray, old: np.ndarray) -> None:
+        """Update the hash after the given cells have changed"""
+        new = self._grid.flat[cells]
+        table = zobrist_table(self._grid.size)
+        for cell, before, after in zip(cells.tolist(), old.tolist(), new.tolist()):
+            self._zobrist ^= table[cell][before] ^ table[cell][after]
+        self._invalidate()
+
+    def _update_from(self, old: np.ndarray) -> None:
+        """Update the hash after the grid has changed from the old exponents"""
+        cells = np.flatnonzero(self._grid != old)
+        self._update(cells, old.flat[cells])
+
+    def _set_tile(self, row: int, col: int, value: int) -> None:
+        """Put a tile into an empty cell and update the hash"""
+        cell = row * self.width + col
+        exp = int(value).bit_length() - 1
+        self._grid[row, col] = exp
+        self._zobrist ^= zobrist_table(self._grid.size)[cell][exp]
+        self._invalidate()
 
     def reset(self) -> None:
         """Reset the grid"""
-        self._grid = np.zeros((self.height, self.width), dtype=int)
+        self._grid = np.zeros((self.height, self.width), dtype=np.uint8)
+        self._journal.clear()
+        self._rebuild()
         self.score = 0
         self.moves = 0
-        empty_fields = self.get_empty_fields()
-        self.add_random_tile(empty_fields)
-        self.add_random_tile(empty_fields)
+        self.add_random_tile()
+        self.add_random_tile()
         self.state = STATE.IDLE
 
+    @property
+    def empty_count(self) -> int:
+        """Return the number of empty fields"""
+        return self.empty_cells.size
+
+    @property
+    def empty_cells(self) -> np.ndarray:
+        """Return a read-only array of the flat indices of the empty fields.
+        The array is cached until the grid changes."""
+        if self._empty is None:
+            self._empty = np.flatnonzero(self._grid == 0)
+            self._empty.flags.writeable = False
+        return self._empty
+
     def get_empty_fields(self) -> list[tuple[Any]]:
         """Return a list of tuples containing the coordinates of empty fields"""
-        return list(zip(*np.nonzero(self._grid == 0)))
-
-    def add_random_tile(self, empty_fields: list) -> None:
-        """Add a random tile to the grid"""
-        if empty_fields:
-            row, col = choice(empty_fields)
-            self._grid[row, col] = choices([2, 4], [0.9, 0.1])[0]
-            empty_fields.remove((row, col))
+        return [divmod(cell, self.width) for cell in self.empty_cells.tolist()]
+
+    def add_random_tile(self, empty_fields: list | None = None) -> None:
+        """Add a random tile to the grid.
+        Picks one of the given empty fields or, by default, any empty field."""
+        if empty_fields is None:
+            empty = self.empty_cells
+            if empty.size:
+                index, value = self.spawner.draw(empty.size)
+                cell = int(empty[index])
+                self._set_tile(*divmod(cell, self.width), value)
+        elif empty_fields:
+            index, value = self.spawner.draw(len(empty_fields))
+            row, col = empty_fields.pop(index)
+            self._set_tile(row, col, value)
 
     def put_random_tile(self, row: int, col: int) -> None:
         """Put a random tile at the given coordinates"""
@@ -217,40 +444,99 @@ class Grid2048:
             raise ValueError("Invalid coordinates")
         if self._grid[row, col] != 0:
             raise ValueError("Cell is not empty")
-        self._grid[row, col] = choices([2, 4], [0.9, 0.1])[0]
+        self._set_tile(row, col, self.spawner.draw(1)[1])
+
+    def preview(self, direction: DIRECTION) -> Preview:
+        """Return the result of a move in the given direction
+        without changing the grid"""
+        data = self._grid.copy()
+        score, changed = shift(data, direction)
+        return Preview(direction, VALUES[data], score, changed)
+
+    def successors(self) -> list[Preview]:
+        """Return the previews of the moves in all directions"""
+        return [self.preview(direction) for direction in DIRECTION]
+
+    def make_move(self, direction: DIRECTION) -> bool:
+        """Execute a move in place without adding a tile and record it
+        in the journal, so it can be reverted with unmake().
+        Returns True if the move is valid, invalid moves are not recorded."""
+        old = self._grid.copy()
+        score, changed = shift(self._grid, direction)
+        if not changed:
+            return False
+        cells = np.flatnonzero(self._grid != old)
+        self._journal.append(Undo(cells, old.flat[cells], score, 1))
+        self._update(cells, old.flat[cells])
+        self.score += score
+        self.moves += 1
+        return True
+
+    def make_tile(self, row: int, col: int, value: int | None = None) -> None:
+        """Put a tile (random if value is None) at the given coordinates
+        and record it in the journal, so it can be reverted with unmake()."""
+        if not 0 <= row < self.height or not 0 <= col < self.width:
+            raise ValueError("Invalid coordinates")
+        if value is None:
+            self.put_random_tile(row, col)
+        else:
+            value = int(value)
+            if value < 2 or value & (value - 1):
+                raise ValueError(f"Invalid tile value: {value}")
+            if self._grid[row, col] != 0:
+                raise ValueError("Cell is not empty")
+            self._set_tile(row, col, value)
+        cell = np.array([row * self.width + col])
+        self._journal.append(Undo(cell, np.zeros(1, dtype=np.uint8), 0, 0))
+
+    def unmake(self) -> None:
+        """Revert the last change recorded in the journal"""
+        if not self._journal:
+            raise ValueError("Nothing to unmake")
+        undo = self._journal.pop()
+        old = self._grid.flat[undo.cells]
+        self._grid.flat[undo.cells] = undo.values
+        self._update(undo.cells, old)
+        self.score -= undo.score
+        self.moves -= undo.moves
 
     @property
     def no_moves(self) -> bool:
-        """Check if there are any moves left"""
-        for row, col in np.ndindex(self.height, self.width):
-            if self._grid[row, col] == 0:
-                return False
-            if (
-                row < self.height - 1
-                and self._grid[row, col] == self._grid[row + 1, col]
-            ):
-                return False
-            if (
-                col < self.width - 1
-                and self._grid[row, col] == self._grid[row, col + 1]
-            ):
-                return False
-        return True
+        """Check if there are any moves left.
+        The result is cached until the grid changes."""
+        if self._no_moves is None:
+            grid = self._grid
+            self._no_moves = not (
+                self.empty_cells.size
+                or (grid[1:, :] == grid[:-1, :]).any()
+                or (grid[:, 1:] == grid[:, :-1]).any()
+            )
+        return self._no_moves
 
-    def move(self, move: Move, add_tile: bool = True) -> bool:
-        """Execute a move and return True if the move is valid."""
+    def move(self, move: Move | DIRECTION, add_tile: bool = True) -> bool:
+        """Execute a move and return True if the move is valid.
+        The move can be given as a Move or directly as a DIRECTION."""
         if self.state == STATE.RUNNING or self.no_moves:
             return False
         self.state = STATE.RUNNING
-        move(self)
-        self._last_move = move
-        self.score += move.score
-        if move.is_valid:
+        if isinstance(move, DIRECTION):
+            old = self._grid.copy()
+            score, changed = shift(self._grid, move)
+            if changed:
+                self._update_from(old)
+            # the Move is only created if last_move is asked for
+            self._last_move = (move, score, changed)
+        else:
+            move(self)  # the move updates the hash and the caches
+            score, changed = move.score, move.is_valid
+            self._last_move = move
+        self.score += score
+        if changed:
             self.moves += 1
             if add_tile:
-                self.add_random_tile(self.get_empty_fields())
+                self.add_random_tile()
         self.state = STATE.IDLE
-        return move.is_valid
+        return changed
 
 
 class MoveFactory:
@@ -269,5 +555,10 @@ class MoveFactory:
             return Move(direction, cls.move_directions[direction.name])
         except KeyError as exc:
             raise ValueError(f"Invalid direction: {direction}") from exc
-        except Exception as exc:
-            raise exc
+
+    @classmethod
+    def from_result(cls, direction: DIRECTION, score: int, changed: bool) -> Move:
+        """Create a Move that has been executed with the given result"""
+        move = cls.create(direction)
+        move.record(score, changed)
+        return move
@@ -1,74 +1,171 @@
-import itertools
-from math import log
+"""Compact keys of 2048 grids.
+
+A key stores the grid height and width in its lowest 16 bits (a byte each)
+followed by 5 bits per tile exponent in row-major order, so it fits tiles
+up to 2**31. Keys are Python ints (or their little-endian bytes) and can
+back dictionaries and on-disk indexes. As text they are written in hex with
+a 0x prefix (format_key()), which tells them apart from the strings of the
+old format: the height, the width and every exponent as one hex digit.
+encode() and decode() convert whole stacks of boards at once.
+"""
+
+import numpy as np
+
+from .grid2048 import VALUES, to_exponents
+
+BITS = 5
+HEADER = 2  # bytes
+_SHIFTS = np.arange(BITS, dtype=np.uint8)
+
+
+def _key_length(height: int, width: int) -> int:
+    """Return the number of bytes of the key of a grid"""
+    return HEADER + (height * width * BITS + 7) // 8
+
+
+def _legacy_exponents(text: str) -> np.ndarray:
+    """Return the tile exponents of a key string of the old format"""
+    try:
+        height, width = int(text[0], 16), int(text[1], 16)
+        exps = [int(char, 16) for char in text[2:]]
+    except (IndexError, ValueError) as exc:
+        raise ValueError(f"Invalid key: {text!r}") from exc
+    if not height or not width or len(exps) != height * width:
+        raise ValueError(f"Invalid key: {text!r}")
+    return np.array(exps, dtype=np.uint8).reshape(height, width)
+
+
+def format_key(key: int) -> str:
+    """Return the text form of a key"""
+    return f"{key:#x}"
+
+
+def parse_key(text: str) -> int:
+    """Return the key of a text written by format_key()
+    or of a string of the old format"""
+    if text.startswith("0x"):
+        try:
+            return int(text, 16)
+        except ValueError as exc:
+            raise ValueError(f"Invalid key: {text!r}") from exc
+    return int.from_bytes(encode(_legacy_exponents(text)[None])[0].tobytes(), "little")
+
+
+def _key_bytes(key: int | bytes | str) -> bytes:
+    """Return the bytes of an int, bytes or text key"""
+    if isinstance(key, (bytes, bytearray)):
+        return bytes(key)
+    if isinstance(key, str):
+        key = parse_key(key)
+    if not isinstance(key, (int, np.integer)) or key < 0:
+        raise TypeError("Key must be a non-negative int, bytes or str")
+    key = int(key)
+    length = _key_length(key & 0xFF, (key >> 8) & 0xFF)
+    if key.bit_length() > length * 8:
+        raise ValueError("Invalid key length")
+    return key.to_bytes(length, "little")
+
+
+def encode(boards: np.ndarray) -> np.ndarray:
+    """Encode a stack of boards of tile exponents (N, height, width)
+    into an (N, key length) uint8 array, one row of key bytes per board"""
+    boards = np.asarray(boards)
+    if boards.ndim != 3 or not np.issubdtype(boards.dtype, np.integer):
+        raise TypeError("Boards must be a 3D array of tile exponents")
+    count, height, width = boards.shape
+    if height > 0xFF or width > 0xFF:
+        raise ValueError(f"Grid too large to hash: {height}x{width}")
+    if boards.size and (boards.min() < 0 or boards.max() >= 1 << BITS):
+        raise ValueError(f"Tile exponents must be in range(0, {1 << BITS})")
+    bits = (boards.astype(np.uint8).reshape(count, -1, 1) >> _SHIFTS) & 1
+    cells = np.packbits(bits.reshape(count, -1), axis=1, bitorder="little")
+    header = np.broadcast_to(np.array([height, width], dtype=np.uint8), (count, 2))
+    return np.hstack((header, cells))
+
+
+def decode(keys) -> np.ndarray:
+    """Decode keys into a stack of boards of tile exponents (N, height, width).
+    Keys are an array returned by encode() or a sequence of int, bytes or text
+    keys.
+    All the keys must belong to grids of the same size."""
+    if not isinstance(keys, np.ndarray):
+        rows = [_key_bytes(key) for key in keys]
+        if len({len(row) for row in rows}) > 1:
+            raise ValueError("Keys of different grid sizes")
+        keys = np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(len(rows), -1)
+    if keys.ndim != 2 or not len(keys):
+        raise ValueError("Expected a non-empty 2D array of keys")
+    count = len(keys)
+    height, width = int(keys[0, 0]), int(keys[0, 1])
+    if height == 0 or width == 0:
+        raise ValueError("Invalid grid dimensions in key")
+    if (keys[:, :HEADER] != keys[0, :HEADER]).any():
+        raise ValueError("Keys of different grid sizes")
+    if keys.shape[1] != _key_length(height, width):
+        raise ValueError("Invalid key length")
+    size = height * width
+    bits = np.unpackbits(keys[:, HEADER:], axis=1, bitorder="little")
+    bits = bits[:, : size * BITS].reshape(count, size, BITS)
+    exps = (bits << _SHIFTS).sum(axis=2, dtype=np.uint8)
+    return exps.reshape(count, height, width)
 
 
 class Hasher:
+    """Compact key of a grid.
+    The grid is a Grid2048 (or a bitboard), a 2D array or a 2D list of tile values."""
+
     def __init__(self, grid):
-        if not isinstance(grid, (list, tuple)) or not all(
-            isinstance(row, (list, tuple)) for row in grid
-        ):
-            raise TypeError("Grid must be a 2D list or tuple")
-        self.grid = grid
-        self.height = len(grid)
-        self.width = len(grid[0]) if self.height > 0 else 0
-        if not all(len(row) == self.width for row in grid):
-            raise ValueError("All rows must have the same length")
-
-    def hash(self) -> str:
-        """Hash the grid into a string representation"""
-        h = [hex(self.height)[2:], hex(self.width)[2:]]
-        for row, col in itertools.product(range(self.height), range(self.width)):
-            tile = self.grid[row][col]
-            if not isinstance(tile, (int, float)) and tile is not None:
-                raise TypeError(f"Invalid tile value at ({row}, {col}): {tile}")
-            # Handle zero, negative numbers, and None values
-            if tile is None or tile <= 0:
-                h.append("0")
-            else:
-                try:
-                    h.append(hex(int(log(tile, 2)))[2:])
-                except ValueError as e:
-                    raise ValueError(
-                        f"Cannot compute log of {tile} at ({row}, {col})"
-                    ) from e
-        return "".join(h)
-
-    def dehash(self, hashed: str) -> list[list[int]]:
-        """Convert a hash string back to a grid"""
-        if not isinstance(hashed, str):
-            raise TypeError("Hash must be a string")
-        if len(hashed) < 4:
-            raise ValueError("Invalid hash length")
+        exps = getattr(grid, "exponents", None)
+        if exps is None:
+            if isinstance(grid, (list, tuple)):
+                if not all(isinstance(row, (list, tuple)) for row in grid):
+                    raise TypeError("Grid must be a 2D list or tuple")
+                if len({len(row) for row in grid}) > 1:
+                    raise ValueError("All rows must have the same length")
+                grid = np.array(grid)
+            if not isinstance(grid, np.ndarray) or grid.ndim != 2:
+                raise TypeError("Grid must be a Grid2048, a 2D array or a 2D list")
+            if not np.issubdtype(grid.dtype, np.integer):
+                raise TypeError("Grid values must be integers")
+            exps = to_exponents(grid)
+        self.exponents = np.array(exps, dtype=np.uint8)  # a copy, grids change
+        self.height, self.width = self.exponents.shape
 
-        try:
-            height = int(hashed[:2], 16)
-            width = int(hashed[2:4], 16)
-        except ValueError as e:
-            raise ValueError("Invalid dimensions in hash") from e
-
-        if height <= 0 or width <= 0:
-            raise ValueError("Invalid grid dimensions in hash")
-
-        grid = [[0 for _ in range(width)] for _ in range(height)]
-        hashed = hashed[4:]
-        while len(hashed) < height * width:
-            hashed = f"0{hashed}"
-
-        for row, col in itertools.product(range(height), range(width)):
-            try:
-                h = int(hashed[row * width + col], 16)
-                grid[row][col] = 2**h if h > 0 else 0
-            except (ValueError, IndexError) as e:
-                raise ValueError(
-                    f"Invalid hash value at position {row * width + col}"
-                ) from e
-
-        return grid
+    @classmethod
+    def from_key(cls, key: int | bytes | str) -> "Hasher":
+        """Create a hasher of the grid stored in the key"""
+        hasher = cls.__new__(cls)
+        hasher.exponents = cls.dehash_exponents(key)
+        hasher.height, hasher.width = hasher.exponents.shape
+        return hasher
+
+    def to_bytes(self) -> bytes:
+        """Return the key of the grid as bytes"""
+        return encode(self.exponents[None])[0].tobytes()
+
+    def key(self) -> int:
+        """Return the key of the grid as an int"""
+        return int.from_bytes(self.to_bytes(), "little")
+
+    hash = key  # the old name of key()
+
+    @staticmethod
+    def dehash_exponents(key: int | bytes | str) -> np.ndarray:
+        """Convert a key back to a 2D array of tile exponents"""
+        return decode([key])[0]
+
+    @staticmethod
+    def dehash(key: int | bytes | str) -> np.ndarray:
+        """Convert a key back to a 2D array of tile values"""
+        return VALUES[Hasher.dehash_exponents(key)]
+
+    def __repr__(self):
+        return f"Hasher({self.key():#x})"
 
     def __eq__(self, other):
         if not isinstance(other, Hasher):
             return False
-        return self.hash() == other.hash()
+        return self.to_bytes() == other.to_bytes()
 
     def __hash__(self):
-        return hash(self.hash())
+        return hash(self.to_bytes())
@@ -1,22 +1,171 @@
 """Helper functions for computing the score of a grid."""
 
-from copy import deepcopy
-from itertools import product
 import math
-from typing import Any, List, Optional
+from typing import Any, List, NamedTuple, Optional
 import numpy as np
 
-from grid2048.grid2048 import DIRECTION, Grid2048, MoveFactory
+from grid2048.bitboard import Bitboard2048, pack_board, transpose
+from grid2048.grid2048 import DIRECTION, VALUES, Grid2048
+from grid2048.tables import get_row_table, lookup, unpack
+
+# tables indexed by the exponents of two neighbouring tiles
+_EXPONENTS = np.arange(len(VALUES))
+_BOTH = (_EXPONENTS[:, None] != 0) & (_EXPONENTS[None, :] != 0)
+_EXP_DIFF = np.abs(_EXPONENTS[:, None] - _EXPONENTS[None, :]) * _BOTH
+_VALUE_DIFF = np.abs(VALUES[:, None] - VALUES[None, :]) * _BOTH
+_HIGHER = np.where(_EXPONENTS[:, None] > _EXPONENTS[None, :], VALUES[:, None], 0)
+# exponents of the tiles counted by pairs() by default (2 to 32768)
+_PAIR_TILES = (_EXPONENTS >= 1) & (_EXPONENTS <= 15)
+
+_neighbours: dict[tuple[int, int], dict[str, tuple[np.ndarray, np.ndarray]]] = {}
+
+
+def _get_neighbours(
+    height: int, width: int
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Return the flat indices of the pairs of cells compared by the heuristics:
+    "adjacent" - every cell with its right and bottom neighbour,
+    "inner" - the same for the cells outside the last row and column,
+    "edge" - every edge cell with its neighbour inside the grid (corners twice),
+    "lines" - the cells of the rows and then of the columns without their last
+    cell, and the number of the line of every cell."""
+    if (height, width) not in _neighbours:
+        idx = np.arange(height * width).reshape(height, width)
+        inner = idx[:-1, :-1].ravel()
+        _neighbours[height, width] = {
+            "adjacent": (
+                np.concatenate((idx[:, :-1].ravel(), idx[:-1, :].ravel())),
+                np.concatenate((idx[:, 1:].ravel(), idx[1:, :].ravel())),
+            ),
+            "inner": (
+                np.concatenate((inner, inner)),
+                np.concatenate((idx[1:, :-1].ravel(), idx[:-1, 1:].ravel())),
+            ),
+            "edge": (
+                np.concatenate((idx[0], idx[-1], idx[:, 0], idx[:, -1])),
+                np.concatenate((idx[1], idx[-2], idx[:, 1], idx[:, -2])),
+            ),
+            "lines": (
+                np.concatenate((idx[:, :-1].ravel(), idx[:-1, :].T.ravel())),
+                np.concatenate(
+                    (
+                        np.repeat(np.arange(height), width - 1),
+                        np.repeat(np.arange(height, height + width), height - 1),
+                    )
+                ),
+            ),
+        }
+    return _neighbours[height, width]
+
+
+def _pair_sum(grid: Grid2048, table: np.ndarray, pairs_of: str) -> int:
+    """Sum a table indexed by the exponents of the given pairs of cells"""
+    first, second = _get_neighbours(grid.height, grid.width)[pairs_of]
+    exps = grid.exponents.ravel()
+    return int(table[exps[first], exps[second]].sum())
+
+
+ROW_LENGTH = 4  # length of the rows with precomputed heuristics
+
+
+class RowHeuristics(NamedTuple):
+    """Heuristics of every row of 4 exponents, indexed by the packed row.
+    The heuristics of a 4x4 board are sums over its rows and columns."""
+
+    monotonicity: np.ndarray  # exponent differences of non-empty neighbours
+    smoothness: np.ndarray  # value differences of non-empty neighbours
+    empty: np.ndarray  # number of empty cells
+    merge: np.ndarray  # score of shifting the row
+    edge: np.ndarray  # sum of the tiles, the weight of the row on an edge
+
+
+_row_heuristics: RowHeuristics | None = None
+_row_lists: RowHeuristics | None = None  # the same tables as lists for fast lookups
+
+
+def build_row_heuristics() -> RowHeuristics:
+    """Compute the heuristics of all the rows of 4 exponents"""
+    rows = unpack(np.arange(16**ROW_LENGTH, dtype=np.int64), ROW_LENGTH)
+    values = VALUES[rows]
+    both = (rows[:, :-1] != 0) & (rows[:, 1:] != 0)
+    return RowHeuristics(
+        (np.abs(np.diff(rows)) * both).sum(axis=1),
+        (np.abs(np.diff(values)) * both).sum(axis=1),
+        (rows == 0).sum(axis=1),
+        get_row_table(ROW_LENGTH).score_left.astype(np.int64),
+        values.sum(axis=1),
+    )
+
+
+def get_row_heuristics() -> RowHeuristics:
+    """Return the row heuristics, building them on first use"""
+    global _row_heuristics, _row_lists  # pylint: disable=global-statement
+    if _row_heuristics is None:
+        _row_heuristics = build_row_heuristics()
+        _row_lists = None
+    return _row_heuristics
+
+
+def save_row_heuristics(path: str) -> None:
+    """Save the row heuristics to a .npz file"""
+    np.savez(path, **get_row_heuristics()._asdict())
+
+
+def load_row_heuristics(path: str) -> RowHeuristics:
+    """Load the row heuristics saved by save_row_heuristics"""
+    global _row_heuristics, _row_lists  # pylint: disable=global-statement
+    with np.load(path) as data:
+        _row_heuristics = RowHeuristics(*(data[f] for f in RowHeuristics._fields))
+    _row_lists = None
+    return _row_heuristics
+
+
+def _get_row_lists() -> RowHeuristics:
+    """Return the row heuristics as lists, indexing them is faster for single rows"""
+    global _row_lists  # pylint: disable=global-statement
+    if _row_lists is None:
+        _row_lists = RowHeuristics(*(t.tolist() for t in get_row_heuristics()))
+    return _row_lists
+
+
+def _packed_board(grid: Grid2048) -> int | None:
+    """Return a 4x4 grid packed as a bitboard.
+    Returns None for other grids and for tiles too big to be packed."""
+    if isinstance(grid, Bitboard2048):
+        return grid.board
+    if grid.width != ROW_LENGTH or grid.height != ROW_LENGTH:
+        return None
+    try:
+        return pack_board(grid.exponents)
+    except ValueError:
+        return None
+
+
+def _packed_lines(grid: Grid2048) -> list[int] | None:
+    """Return the packed rows and then the packed columns of a 4x4 grid.
+    Returns None for other grids and for tiles too big to be packed."""
+    board = _packed_board(grid)
+    return None if board is None else _board_lines(board)
+
+
+def _board_lines(board: int) -> list[int]:
+    """Return the packed rows and then the packed columns of a bitboard"""
+    cols = transpose(board)
+    return [
+        board & 0xFFFF,
+        (board >> 16) & 0xFFFF,
+        (board >> 32) & 0xFFFF,
+        board >> 48,
+        cols & 0xFFFF,
+        (cols >> 16) & 0xFFFF,
+        (cols >> 32) & 0xFFFF,
+        cols >> 48,
+    ]
 
 
 def get_valid_moves(grid: Grid2048) -> List[DIRECTION]:
     """Return a list of valid moves for the grid."""
-    valid = []
-    for direction in DIRECTION:
-        cmp = deepcopy(grid)
-        if cmp.move(MoveFactory.create(direction)):
-            valid.append(direction)
-    return valid
+    return [preview.direction for preview in grid.successors() if preview.is_valid]
 
 
 def normalize(values: List[Any]) -> List[float]:
@@ -32,7 +181,7 @@ def normalize(values: List[Any]) -> List[float]:
 
 def zeros(grid: Grid2048) -> int:
     """Returns the number of empty cells in the grid."""
-    return np.count_nonzero(grid.data == 0)
+    return grid.empty_count
 
 
 def monotonicity(grid: Grid2048) -> float:
@@ -40,36 +189,26 @@ def monotonicity(grid: Grid2048) -> float:
     Its counted by adding the difference of powers of 2 between each element
     Returns the square root of grid size divided by the final score,
     so the bigger the result, the more monotonous the grid is."""
-    score = 0
-    for row in grid.data:
-        for i in range(len(row) - 1):
-            if row[i] != 0 and row[i + 1] != 0:
-                try:
-                    score += abs(math.log2(row[i]) - math.log2(row[i + 1]))
-                except ValueError:
-                    continue
-    for col in zip(*grid.data):
-        for i in range(len(col) - 1):
-            if col[i] != 0 and col[i + 1] != 0:
-                try:
-                    score += abs(math.log2(col[i]) - math.log2(col[i + 1]))
-                except ValueError:
-                    continue
+    score = _monotonicity_sum(grid, _packed_lines(grid))
     return (grid_size(grid) ** 2 / score) if score != 0 else 0
 
 
+def _monotonicity_sum(grid: Grid2048, lines: list[int] | None) -> int:
+    """Sum the exponent differences of all the non-empty neighbours"""
+    if lines is None:
+        return _pair_sum(grid, _EXP_DIFF, "adjacent")
+    table = _get_row_lists().monotonicity
+    return sum(table[line] for line in lines)
+
+
 def smoothness(grid: Grid2048) -> float:
     """Returns the smoothness of the grid.
     It works by iterating through the grid, and comparing each element
     with its neighbors, and adding the absolute difference between them.
     In this case, the smaller the difference, the better, so final result
-    is square of the grid size divided by the smoothness."""
-    smoothness_count = 0
-    for i, j in product(range(grid.height - 1), range(grid.width - 1)):
-        if grid[i, j] != grid[i + 1, j] and grid[i, j] != 0 and grid[i + 1, j] != 0:
-            smoothness_count += abs(grid[i, j] - grid[i + 1, j])
-        if grid[i, j] != grid[i, j + 1] and grid[i, j] != 0 and grid[i, j + 1] != 0:
-            smoothness_count += abs(grid[i, j] - grid[i, j + 1])
+    is square of the grid size divided by the smoothness.
+    Only the cells outside the last row and column are compared."""
+    smoothness_count = _smoothness_sum(grid, _packed_lines(grid))
     grid_total = np.sum(grid.data)
     return (
         (grid_total / smoothness_count)
@@ -78,36 +217,32 @@ def smoothness(grid: Grid2048) -> float:
     )
 
 
+def _smoothness_sum(grid: Grid2048, lines: list[int] | None) -> int:
+    """Sum the value differences of the non-empty neighbours compared by smoothness"""
+    if lines is None:
+        return _pair_sum(grid, _VALUE_DIFF, "inner")
+    # all rows and columns but the last ones
+    table = _get_row_lists().smoothness
+    return sum(table[line] for line in lines[:3] + lines[4:7])
+
+
 def pairs(grid: Grid2048, values: Optional[List[int]] = None) -> float:
     """Returns the sum of the pairs in the grid
     divided by the number of cells in the grid.
     You can also specify the values of the pairs to count.
-    That includes pairs with holes in between."""
+    That includes pairs with holes in between.
+    The last cell of every row and column is not taken into account."""
     if values is None:
-        values = [2**x for x in range(1, 16)]
-    pairs_count = 0
-    tmp: List[int] = []
-
-    # Check rows
-    for row in grid.data:
-        tmp.extend(
-            row[i] for i in range(len(row) - 1) if row[i] != 0 and row[i] in values
-        )
-        for i in range(len(tmp) - 1):
-            if tmp[i] == tmp[i + 1]:
-                pairs_count += tmp[i]
-        tmp.clear()
-
-    # Check columns
-    for col in zip(*grid.data):
-        tmp.extend(
-            col[i] for i in range(len(col) - 1) if col[i] != 0 and col[i] in values
-        )
-        for i in range(len(tmp) - 1):
-            if tmp[i] == tmp[i + 1]:
-                pairs_count += tmp[i]
-        tmp.clear()
-
+        selected = _PAIR_TILES
+    else:
+        selected = np.isin(VALUES, values) & (VALUES != 0)
+    cells, line = _get_neighbours(grid.height, grid.width)["lines"]
+    tiles = grid.exponents.ravel()[cells]
+    mask = selected[tiles]
+    tiles, line = tiles[mask], line[mask]
+    # a pair is a selected tile equal to the next selected tile in its line
+    same = (tiles[1:] == tiles[:-1]) & (line[1:] == line[:-1])
+    pairs_count = int(VALUES[tiles[:-1][same]].sum())
     grid_size_val = grid_size(grid)
     return pairs_count / grid_size_val if grid_size_val != 0 else 0
 
@@ -117,12 +252,9 @@ def flatness(grid: Grid2048) -> float:
     It works by iterating through the grid and adding
     the absolute difference between each tile and the max
     tile of its row. Divided by the number of cells in the grid."""
-    flatness_count = 0
-    for row in grid.data:
-        max_val = max(row) if any(row) else 0
-        for cell in row:
-            if cell != 0:
-                flatness_count += abs(cell - max_val)
+    data = grid.data
+    diff = data.max(axis=1, keepdims=True) - data
+    flatness_count = int(diff[data != 0].sum())
     grid_size_val = grid_size(grid)
     return flatness_count / grid_size_val if grid_size_val != 0 else 0
 
@@ -131,14 +263,9 @@ def high_vals_on_edge(grid: Grid2048, divider: int = 256) -> float:
     """Returns the sum of high values (greater or equal to divider)
     that are on the edge the grid.
     Result is divided by the number of cells in the grid."""
-    high_vals = 0
-    for i, j in product(range(grid.height), range(grid.width)):
-        if grid[i, j] == 0:
-            continue
-        if grid[i, j] >= divider and (
-            i == 0 or j == 0 or i == grid.height - 1 or j == grid.width - 1
-        ):
-            high_vals += grid[i, j]
+    data = grid.data
+    high = np.where(data >= divider, data, 0)
+    high_vals = high.sum() - high[1:-1, 1:-1].sum()
     grid_size_val = grid_size(grid)
     return int(high_vals) / grid_size_val if grid_size_val != 0 else 0
 
@@ -147,50 +274,34 @@ def high_vals_in_corner(grid: Grid2048, divider: int = 256) -> float:
     """Returns the sum of high values (greater or equal to divider)
     that are in the corners of the grid.
     Result is divided by the number of cells in the grid."""
-    corner_vals = 0
-    if grid[0, 0] >= divider:
-        corner_vals += grid[0, 0]
-    if grid[0, grid.width - 1] >= divider:
-        corner_vals += grid[0, grid.width - 1]
-    if grid[grid.height - 1, 0] >= divider:
-        corner_vals += grid[grid.height - 1, 0]
-    if grid[grid.height - 1, grid.width - 1] >= divider:
-        corner_vals += grid[grid.height - 1, grid.width - 1]
+    data = grid.data
+    corners = (data[0, 0], data[0, -1], data[-1, 0], data[-1, -1])
+    corner_vals = sum(tile for tile in corners if tile >= divider)
     grid_size_val = grid_size(grid)
     return int(corner_vals) / grid_size_val if grid_size_val != 0 else 0
 
 
 def higher_on_edge(grid: Grid2048) -> float:
     """Returns the sum of the edge values that are higher than their neighbors inside the grid.
+    Corner tiles are counted for both of their edges.
     Result is divided by the number of cells in the grid."""
-    higher = 0
-    for i, j in product(range(grid.height), range(grid.width)):
-        if grid[i, j] == 0:
-            continue
-        if i == 0 and grid[i, j] > grid[i + 1, j]:
-            higher += grid[i, j]
-        if i == grid.height - 1 and grid[i, j] > grid[i - 1, j]:
-            higher += grid[i, j]
-        if j == 0 and grid[i, j] > grid[i, j + 1]:
-            higher += grid[i, j]
-        if j == grid.width - 1 and grid[i, j] > grid[i, j - 1]:
-            higher += grid[i, j]
+    higher = _pair_sum(grid, _HIGHER, "edge")
     grid_size_val = grid_size(grid)
-    return int(higher) / grid_size_val if grid_size_val != 0 else 0
+    return higher / grid_size_val if grid_size_val != 0 else 0
+
+
+def _count_high_low(grid: Grid2048, divider: int) -> tuple[int, int]:
+    """Return the number of non-empty tiles at or above the divider and below it"""
+    data = grid.data
+    filled = data != 0
+    high_vals = int(np.count_nonzero(filled & (data >= divider)))
+    return high_vals, int(np.count_nonzero(filled)) - high_vals
 
 
 def high_to_low(grid: Grid2048, divider: int = 256) -> float:
     """Returns the ratio between the high and low values in the grid.
     Values are normalized to be between 0 and 1."""
-    high_vals = 0
-    low_vals = 0
-    for i, j in product(range(grid.height), range(grid.width)):
-        if grid[i, j] == 0:
-            continue
-        if grid[i, j] >= divider:
-            high_vals += 1
-        else:
-            low_vals += 1
+    high_vals, low_vals = _count_high_low(grid, divider)
     total = high_vals + low_vals
     if total == 0:
         return 0
@@ -201,15 +312,7 @@ def high_to_low(grid: Grid2048, divider: int = 256) -> float:
 def low_to_high(grid: Grid2048, divider: int = 256) -> float:
     """Returns the ratio between the low and high values in the grid.
     Values are normalized to be between 0 and 1."""
-    high_vals = 0
-    low_vals = 0
-    for i, j in product(range(grid.height), range(grid.width)):
-        if grid[i, j] == 0:
-            continue
-        if grid[i, j] >= divider:
-            high_vals += 1
-        else:
-            low_vals += 1
+    high_vals, low_vals = _count_high_low(grid, divider)
     total = high_vals + low_vals
     if total == 0:
         return 0
@@ -233,43 +336,34 @@ def count_vals_gte(grid: Grid2048, divider: int = 256) -> int:
 
 
 def zero_field(grid: Grid2048) -> int:
-    """Returns the number of empty fields that are surrounded by empty fields."""
-    field = 0
-    for i, j in product(range(grid.height - 1), range(grid.width - 1)):
-        if grid[i, j] != 0:
-            continue
-        if (
-            grid[i, j] == grid[i + 1, j] == grid[i, j + 1]
-            or grid[i, j] == grid[i + 1, j] == grid[i + 1, j + 1]
-            or grid[i, j] == grid[i, j + 1] == grid[i + 1, j + 1]
-        ):
-            field += 1
-    return field
+    """Returns the number of empty fields that are surrounded by empty fields.
+    An empty field counts if at least two of its right, bottom and
+    bottom-right neighbours are empty."""
+    empty = grid.exponents == 0
+    down, right, diagonal = empty[1:, :-1], empty[:-1, 1:], empty[1:, 1:]
+    field = empty[:-1, :-1] & ((down & right) | (down & diagonal) | (right & diagonal))
+    return int(np.count_nonzero(field))
 
 
 def move_score(grid: Grid2048) -> int:
     """Returns the sum of the shifted grid."""
+    lines = _packed_lines(grid)
+    if lines is not None:
+        table = _get_row_lists().merge
+        return sum(table[line] for line in lines)
+    exps = grid.exponents
+    return int(lookup(exps.T)[1].sum() + lookup(exps)[1].sum())
 
-    def combine_tiles(cell: List[int]) -> int:
-        """Combine tiles subfunction."""
-        i = 0
-        score = 0
-        while i < len(cell) - 1:
-            if cell[i] == cell[i + 1]:
-                cell[i] *= 2
-                cell.pop(i + 1)
-                score += cell[i]
-            i += 1
-        return score
-
-    shifted = 0
-    for col in range(grid.width):
-        tmp = [x for x in grid.data[:, col] if x != 0]
-        shifted += combine_tiles(tmp)
-    for row in range(grid.height):
-        tmp = [x for x in grid.data[row, :] if x != 0]
-        shifted += combine_tiles(tmp)
-    return shifted
+
+def edge_sum(grid: Grid2048) -> int:
+    """Returns the sum of the tiles on the edges of the grid.
+    Corner tiles are counted for both of their edges."""
+    lines = _packed_lines(grid)
+    if lines is not None:
+        table = _get_row_lists().edge
+        return table[lines[0]] + table[lines[3]] + table[lines[4]] + table[lines[7]]
+    data = grid.data
+    return int(data[0].sum() + data[-1].sum() + data[:, 0].sum() + data[:, -1].sum())
 
 
 def max_tile(grid: Grid2048) -> int:
@@ -284,7 +378,7 @@ def grid_sum(grid: Grid2048) -> int:
 
 def grid_size(grid: Grid2048) -> int:
     """Returns the number of cells in the grid."""
-    return grid.data.size
+    return grid.width * grid.height
 
 
 def grid_mean(grid: Grid2048) -> float:
@@ -296,3 +390,151 @@ def values_mean(grid: Grid2048) -> float:
     """Returns the mean of all non-zero cells in the grid."""
     non_zero = grid.data[grid.data != 0]
     return float(np.mean(non_zero)) if len(non_zero) > 0 else 0.0
+
+
+# layout of the vector returned by features()
+FEATURES = (
+    "monotonicity",
+    "smoothness",
+    "empty",  # ratio of empty cells
+    "max_log",  # log2 of the max tile
+    "empty_max_log",  # empty * max_log
+    "mono_max_log",  # monotonicity * max_log
+    "high_on_edge_log",  # natural log of high_vals_on_edge(max tile / 2), 0 if none
+    "high_on_edge_sqrt",  # square root of high_vals_on_edge(max tile / 2)
+    "higher_on_edge_sqrt",  # square root of higher_on_edge
+    "values_mean",
+    "mean_per_max_log",  # values_mean / max_log
+    "score_per_move",  # 0 before the first move
+    "sum_per_move",  # grid_sum per move, 0 before the first move
+)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+
+def feature_weights(**weights: float) -> np.ndarray:
+    """Return a weight vector for features() from the weights of the named features"""
+    vector = np.zeros(len(FEATURES))
+    for name, weight in weights.items():
+        if name not in FEATURE_INDEX:
+            raise ValueError(f"Unknown feature: {name!r}")
+        vector[FEATURE_INDEX[name]] = weight
+    return vector
+
+
+# flat indices of the edge cells of a 4x4 grid, and of the edge cells
+# paired with their neighbour inside the grid as in higher_on_edge
+_EDGE_CELLS = (0, 1, 2, 3, 12, 13, 14, 15, 4, 8, 7, 11)
+_EDGE_PAIRS = tuple(zip(*(a.tolist() for a in _get_neighbours(4, 4)["edge"])))
+
+
+def features(grid: Grid2048) -> np.ndarray:
+    """Returns the features used to evaluate the grid, laid out as in FEATURES.
+    The features are computed together, so the grid is scanned only once."""
+    size = grid_size(grid)
+    board = _packed_board(grid)
+    if board is None:
+        mono_sum = _monotonicity_sum(grid, None)
+        smooth_sum = _smoothness_sum(grid, None)
+        data = grid.data
+        total = int(data.sum())
+        top = int(data.max())
+        # same as high_vals_on_edge(grid, top // 2)
+        high = np.where(data >= top // 2, data, 0)
+        high_sum = int(high.sum() - high[1:-1, 1:-1].sum())
+        higher_sum = _pair_sum(grid, _HIGHER, "edge")
+    else:
+        lines = _board_lines(board)
+        rows = _get_row_lists()
+        mono_sum = sum(rows.monotonicity[line] for line in lines)
+        smooth_sum = sum(rows.smoothness[line] for line in lines[:3] + lines[4:7])
+        total = sum(rows.edge[line] for line in lines[:4])
+        cells = [(board >> shift) & 0xF for shift in range(0, 64, 4)]
+        top_exp = max(cells)
+        top = (1 << top_exp) & ~1
+        # tiles of at least top // 2
+        threshold = max(top_exp - 1, 1)
+        high_sum = sum(1 << cells[i] for i in _EDGE_CELLS if cells[i] >= threshold)
+        higher_sum = sum(1 << cells[a] for a, b in _EDGE_PAIRS if cells[a] > cells[b])
+    filled = size - grid.empty_count
+    high_on_edge = high_sum / size
+    higher = higher_sum / size
+
+    mono = size**2 / mono_sum if mono_sum != 0 else 0
+    smooth = total / smooth_sum if smooth_sum != 0 and total != 0 else 0
+    empty = grid.empty_count / size
+    max_log = math.log2(top) if top > 0 else 0.0
+    mean = total / filled if filled > 0 else 0.0
+    return np.array(
+        [
+            mono,
+            smooth,
+            empty,
+            max_log,
+            empty * max_log,
+            mono * max_log,
+            math.log(high_on_edge) if high_on_edge > 0 else 0.0,
+            math.sqrt(high_on_edge),
+            math.sqrt(higher),
+            mean,
+            mean / max_log if max_log > 0 else 0.0,
+            grid.score / grid.moves if grid.moves > 0 else 0.0,
+            total / grid.moves if grid.moves > 0 else 0.0,
+        ]
+    )
+
+
+def batch_features(
+    boards: np.ndarray,
+    score: np.ndarray | None = None,
+    moves: np.ndarray | None = None,
+) -> np.ndarray:
+    """Returns the features of a stack of boards, one row per board laid out
+    as in FEATURES. Boards are tile exponents of shape (N, height, width),
+    score and moves are the game scores and move counts (0 by default)."""
+    count, height, width = boards.shape
+    size = height * width
+    neighbours = _get_neighbours(height, width)
+    flat = boards.reshape(count, size)
+
+    def pair_sums(table: np.ndarray, pairs_of: str) -> np.ndarray:
+        first, second = neighbours[pairs_of]
+        return table[flat[:, first], flat[:, second]].sum(axis=1)
+
+    mono_sum = pair_sums(_EXP_DIFF, "adjacent")
+    smooth_sum = pair_sums(_VALUE_DIFF, "inner")
+    higher_sum = pair_sums(_HIGHER, "edge")
+    values = VALUES[boards]
+    total = values.sum(axis=(1, 2))
+    top = values.max(axis=(1, 2))
+    high = np.where(values >= (top // 2)[:, None, None], values, 0)
+    high_sum = high.sum(axis=(1, 2)) - high[:, 1:-1, 1:-1].sum(axis=(1, 2))
+    empty_count = np.count_nonzero(flat == 0, axis=1)
+    filled = size - empty_count
+    score = np.zeros(count) if score is None else np.asarray(score)
+    moves = np.zeros(count) if moves is None else np.asarray(moves)
+
+    def ratio(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """a / b, 0 where b is 0"""
+        return np.divide(a, b, out=np.zeros(count), where=b != 0)
+
+    mono = ratio(np.full(count, size**2), mono_sum)
+    smooth = ratio(total, np.where(total != 0, smooth_sum, 0))
+    empty = empty_count / size
+    max_log = np.log2(top, out=np.zeros(count), where=top > 0)
+    mean = ratio(total, filled)
+    high_on_edge = high_sum / size
+    result = np.empty((count, len(FEATURES)))
+    result[:, 0] = mono
+    result[:, 1] = smooth
+    result[:, 2] = empty
+    result[:, 3] = max_log
+    result[:, 4] = empty * max_log
+    result[:, 5] = mono * max_log
+    result[:, 6] = np.log(high_on_edge, out=np.zeros(count), where=high_on_edge > 0)
+    result[:, 7] = np.sqrt(high_on_edge)
+    result[:, 8] = np.sqrt(higher_sum / size)
+    result[:, 9] = mean
+    result[:, 10] = ratio(mean, max_log)
+    result[:, 11] = ratio(score, moves)
+    result[:, 12] = ratio(total, moves)
+    return result
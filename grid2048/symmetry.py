@@ -0,0 +1,90 @@
+"""Board symmetries.
+
+A square board has 8 symmetries (rotations and reflections), a rectangular
+one has 4 (reflections only, a transposition would change its shape).
+canonical() maps all the symmetric boards to the same key, so caches can
+share their entries between mirrored and rotated positions. The transform
+it returns maps directions between the board and its canonical form.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from .grid2048 import DIRECTION
+
+
+class Transform(NamedTuple):
+    """Symmetry applied as: transpose, then flip the rows, then flip the columns"""
+
+    transpose: bool
+    flip_rows: bool
+    flip_cols: bool
+
+
+# the identity comes first, the transposing transforms last
+TRANSFORMS = tuple(
+    Transform(transpose, flip_rows, flip_cols)
+    for transpose in (False, True)
+    for flip_rows in (False, True)
+    for flip_cols in (False, True)
+)
+
+_TRANSPOSED = {
+    DIRECTION.UP: DIRECTION.LEFT,
+    DIRECTION.LEFT: DIRECTION.UP,
+    DIRECTION.DOWN: DIRECTION.RIGHT,
+    DIRECTION.RIGHT: DIRECTION.DOWN,
+}
+_FLIPPED_ROWS = {DIRECTION.UP: DIRECTION.DOWN, DIRECTION.DOWN: DIRECTION.UP}
+_FLIPPED_COLS = {DIRECTION.LEFT: DIRECTION.RIGHT, DIRECTION.RIGHT: DIRECTION.LEFT}
+
+
+def transforms(board: np.ndarray) -> tuple[Transform, ...]:
+    """Return the symmetries of a board of the given shape"""
+    height, width = board.shape[-2:]
+    return TRANSFORMS if height == width else TRANSFORMS[:4]
+
+
+def apply(board: np.ndarray, transform: Transform) -> np.ndarray:
+    """Return a view of the board with the transform applied"""
+    if transform.transpose:
+        board = board.swapaxes(-1, -2)
+    if transform.flip_rows:
+        board = board[..., ::-1, :]
+    if transform.flip_cols:
+        board = board[..., ::-1]
+    return board
+
+
+def transform_direction(direction: DIRECTION, transform: Transform) -> DIRECTION:
+    """Map a move on the board to the same move on the transformed board"""
+    if transform.transpose:
+        direction = _TRANSPOSED[direction]
+    if transform.flip_rows:
+        direction = _FLIPPED_ROWS.get(direction, direction)
+    if transform.flip_cols:
+        direction = _FLIPPED_COLS.get(direction, direction)
+    return direction
+
+
+def restore_direction(direction: DIRECTION, transform: Transform) -> DIRECTION:
+    """Map a move on the transformed board back to the original board"""
+    if transform.flip_cols:
+        direction = _FLIPPED_COLS.get(direction, direction)
+    if transform.flip_rows:
+        direction = _FLIPPED_ROWS.get(direction, direction)
+    if transform.transpose:
+        direction = _TRANSPOSED[direction]
+    return direction
+
+
+def canonical(board) -> tuple[bytes, Transform]:
+    """Return the canonical key of a board and the transform that maps
+    the board to its canonical form.
+    The board is a grid or a 2D array of tile exponents. Symmetric boards
+    get the same key, which is the smallest of the transformed boards."""
+    board = np.asarray(getattr(board, "exponents", board), dtype=np.uint8)
+    return min(
+        (np.ascontiguousarray(apply(board, t)).tobytes(), t) for t in transforms(board)
+    )
@@ -0,0 +1,162 @@
+"""Row transition tables for table-driven moves.
+
+Rows are packed as 4-bit tile exponents, the leftmost cell in the lowest
+bits. For every packed row up to table_length cells the tables hold the row
+shifted left and right, the score of the merge and whether the row changed.
+Columns use the same tables through transposition, so any grid size is
+covered. Longer rows are memoized in a bounded cache as they are met instead
+of being tabulated up front. Cells saturate at exponent 15 (32768) inside the
+tables, boards with bigger tiles fall back to the direct vectorized slide.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+MAX_LENGTH = 5  # longest row that can be tabulated (16**MAX_LENGTH entries)
+MAX_EXPONENT = 15  # largest exponent that fits in a 4-bit cell
+MEMO_SIZE = 2**16  # longer rows kept in the memo
+
+table_length = 4  # longest row that is tabulated, see set_table_length()
+
+
+class RowTable(NamedTuple):
+    """Transition tables for packed rows of a given length"""
+
+    length: int
+    left: np.ndarray
+    right: np.ndarray
+    rows_left: np.ndarray
+    rows_right: np.ndarray
+    score_left: np.ndarray
+    score_right: np.ndarray
+    changed_left: np.ndarray
+    changed_right: np.ndarray
+
+
+_tables: dict[int, RowTable] = {}
+
+
+def compact(rows: np.ndarray) -> np.ndarray:
+    """Move the non-zero cells of every row to the left keeping their order"""
+    order = np.argsort(rows == 0, axis=-1, kind="stable")
+    return np.take_along_axis(rows, order, axis=-1)
+
+
+def slide(rows: np.ndarray, reverse: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """Slide rows of exponents to the left (or right) merging equal tiles.
+    Works on arrays of any shape, the last axis being the row.
+    Returns the new rows and the merge score of every row."""
+    if reverse:
+        new, score = slide(rows[..., ::-1])
+        return new[..., ::-1], score
+    new = compact(rows)
+    score = np.zeros(new.shape[:-1], dtype=np.int64)
+    for i in range(new.shape[-1] - 1):
+        merge = (new[..., i] != 0) & (new[..., i] == new[..., i + 1])
+        new[..., i][merge] += 1
+        new[..., i + 1][merge] = 0
+        score[merge] += np.int64(1) << new[..., i][merge].astype(np.int64)
+    return compact(new), score
+
+
+def pack(rows: np.ndarray) -> np.ndarray:
+    """Pack rows of 4-bit exponents into integers"""
+    return rows @ 16 ** np.arange(rows.shape[-1], dtype=np.int64)
+
+
+def unpack(packed: np.ndarray, length: int) -> np.ndarray:
+    """Unpack integers into rows of 4-bit exponents"""
+    shifts = np.arange(0, 4 * length, 4, dtype=np.int64)
+    return (np.asarray(packed, dtype=np.int64)[..., None] >> shifts) & 0xF
+
+
+def build_row_table(length: int) -> RowTable:
+    """Build the transition tables for all packed rows of a given length"""
+    if not 0 < length <= MAX_LENGTH:
+        raise ValueError(f"Row length must be between 1 and {MAX_LENGTH}")
+    index = np.arange(16**length, dtype=np.int64)
+    rows = unpack(index, length)
+    new, score = slide(rows)
+    np.minimum(new, MAX_EXPONENT, out=new)
+    left = pack(new)
+    reverse = pack(rows[:, ::-1])
+    right = np.empty_like(left)
+    right[reverse] = pack(new[:, ::-1])
+    score_right = np.empty_like(score)
+    score_right[reverse] = score
+    return RowTable(
+        length,
+        left.astype(np.uint32),
+        right.astype(np.uint32),
+        unpack(left, length).astype(np.uint8),
+        unpack(right, length).astype(np.uint8),
+        score.astype(np.uint32),
+        score_right.astype(np.uint32),
+        left != index,
+        right != index,
+    )
+
+
+def set_table_length(length: int) -> None:
+    """Set the longest row that is tabulated, longer rows are memoized.
+    The table of 5 cells rows takes about 1M entries and a second to build."""
+    global table_length  # pylint: disable=global-statement
+    if not 0 < length <= MAX_LENGTH:
+        raise ValueError(f"Row length must be between 1 and {MAX_LENGTH}")
+    table_length = length
+
+
+def get_row_table(length: int) -> RowTable:
+    """Return the transition tables for a row length, building them on first use"""
+    if length not in _tables:
+        _tables[length] = build_row_table(length)
+    return _tables[length]
+
+
+def lookup(
+    rows: np.ndarray, reverse: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Shift every row of an array of exponents left (or right when reverse is True).
+    Works on arrays of any shape, the last axis being the row.
+    Returns the shifted rows and the score and changed flag of every row."""
+    length = rows.shape[-1]
+    if length > table_length or (rows.size and rows.max() >= MAX_EXPONENT):
+        new, score = slide(rows.astype(np.int64), reverse)
+        return new, score, (new != rows).any(axis=-1)
+    table = get_row_table(length)
+    packed = pack(rows)
+    if reverse:
+        return (
+            table.rows_right[packed],
+            table.score_right[packed],
+            table.changed_right[packed],
+        )
+    return table.rows_left[packed], table.score_left[packed], table.changed_left[packed]
+
+
+def shift_rows(rows: np.ndarray, reverse: bool = False) -> tuple[np.ndarray, int, bool]:
+    """Shift a 2D array of exponents left (or right when reverse is True).
+    Returns the shifted rows, the score and whether anything has changed."""
+    if rows.shape[-1] > table_length and (not rows.size or rows.max() < MAX_EXPONENT):
+        return _shift_memo(pack(rows).tolist(), rows.shape[-1], reverse)
+    new, score, changed = lookup(rows, reverse)
+    return new, int(score.sum()), bool(changed.any())
+
+
+def _shift_memo(
+    packed: list[int], length: int, reverse: bool
+) -> tuple[np.ndarray, int, bool]:
+    """Shift packed rows that are too long to be tabulated, memoizing every row"""
+    new_rows, scores, changed = zip(
+        *(_shift_row(row, length, reverse) for row in packed)
+    )
+    return np.stack(new_rows), sum(scores), any(changed)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _shift_row(row: int, length: int, reverse: bool) -> tuple[np.ndarray, int, bool]:
+    """Shift a single packed row"""
+    new, score = slide(unpack(np.array(row), length), reverse)
+    return new.astype(np.uint8), int(score), bool(pack(new) != row)
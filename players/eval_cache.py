@@ -0,0 +1,68 @@
+"""Bounded LRU cache for the evaluations of the AI players"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, NamedTuple
+
+from grid2048 import Grid2048
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def board_key(grid: Grid2048) -> Hashable:
+    """Return a compact key of the grid tiles.
+    Bitboards use the packed board, other grids the bytes of the exponents."""
+    board = getattr(grid, "board", None)
+    if board is not None:
+        return board
+    return grid.exponents.tobytes()
+
+
+class EvalCache:
+    """Least recently used cache of grid evaluations.
+    Entries are keyed by the board tiles, the score and the number of moves
+    (the evaluations depend on all of them). When the cache is full,
+    the least recently used entry is dropped."""
+
+    def __init__(self, maxsize: int = 2**16):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive")
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"EvalCache({self.maxsize})"
+
+    def evaluate(self, grid: Grid2048, fn: Callable[[Grid2048], float]) -> float:
+        """Return the cached evaluation of the grid, call fn on a miss"""
+        key = (board_key(grid), grid.score, grid.moves)
+        entries = self._entries
+        value = entries.get(key)
+        if value is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+            return value
+        self.misses += 1
+        value = entries[key] = fn(grid)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return value
+
+    def info(self) -> CacheInfo:
+        """Return the cache statistics"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the statistics"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,78 +1,284 @@
 """AI player using Expectimax algorithm"""
 
 import math
+import multiprocessing
+import time
+import weakref
 from copy import deepcopy
 
 from grid2048 import DIRECTION, Grid2048, Move, MoveFactory, helpers
+from grid2048.grid2048 import VALUES
 from players import AIPlayer
+from players.eval_cache import EvalCache
+from players.transposition import TranspositionTable, position_key
+
+
+class _OutOfBudget(Exception):
+    """Raised to abort a search that has used up its time or node budget"""
+
+
+# player of a pool worker process, created once by _init_worker
+_worker: "ExpectimaxPlayer | None" = None
+
+
+def _init_worker(player_cls, grid_cls, width: int, height: int, settings: dict):
+    """Create the player of a pool worker and build the lookup tables,
+    so the tasks don't pay for it"""
+    global _worker
+    helpers.get_row_heuristics()
+    _worker = player_cls(grid_cls(width, height))
+    for name, value in settings.items():
+        setattr(_worker, name, value)
+
+
+def _search_task(task: tuple) -> tuple[float | None, int]:
+    """Search a subtree in a pool worker.
+    Returns the value (None if the budget ran out) and the number of nodes."""
+    exps, score, moves, depth, probability, generation, deadline, node_limit = task
+    if time.monotonic() > deadline:
+        return None, 0
+    player = _worker
+    grid = player.grid
+    grid.data = VALUES[exps]
+    grid.score, grid.moves = score, moves
+    # entries of the previous moves are replaced first, as in the main process
+    player.table.generation = generation
+    player.nodes = 0
+    player._deadline, player._node_limit = deadline, node_limit
+    try:
+        value = player.expectimax(grid, depth, True, probability)
+    except _OutOfBudget:
+        value = None
+    return value, player.nodes
 
 
 class ExpectimaxPlayer(AIPlayer):
     """AI player using Expectimax algorithm"""
 
     depth = 4
+    weights = helpers.feature_weights(
+        high_on_edge_log=0.95,
+        monotonicity=0.51,
+        smoothness=0.05,
+        empty_max_log=1,
+        score_per_move=1,
+    )
+    cache_size = 2**16  # evaluations kept between the searches
+    table_size = 2**18  # transposition table slots (about 5 MB)
+    spawns = ((2, 0.9), (4, 0.1))  # tile values and their probabilities
+    min_probability = 0.001
+    # branches less likely than min_probability are not searched,
+    # their grids are evaluated directly
+    move_time: float | None = None  # seconds per move
+    max_nodes: int | None = None  # searched nodes per move
+    # With a time or node budget the search deepens iteratively until
+    # the budget runs out and plays the best move of the last completed depth.
+    adaptive_depth = False  # start deeper on boards with few empty cells
+    max_depth = 20
+    workers = 0  # processes searching the root in parallel, 0 to search serially
+    # settings sent to the worker processes
+    worker_settings = ("weights", "spawns", "min_probability")
 
     def __init__(self, grid: Grid2048):
         super().__init__(grid)
         self.height = self.grid.height
         self.width = self.grid.width
+        self.cache = EvalCache(self.cache_size)
+        self.table = TranspositionTable(self.table_size)
+        self.nodes = 0
+        self._node_limit = math.inf
+        self._deadline = math.inf
+        self._pool = None
+        self._finalizer = None
 
     def play(self, *args, **kwargs) -> bool:
         move = MoveFactory.create(self.get_best_move(self.grid))  # type: ignore
         return self.grid.move(move)
 
     def get_best_move(self, grid):
-        best_value = -math.inf
+        # search on a single copy of the grid, moves are made and unmade in place
+        search_grid = deepcopy(grid)
+        self.table.new_search()
+        self.nodes = 0
+        if self.move_time is not None and self.move_time <= 0:
+            raise ValueError("move_time must be positive")
+        if self.max_nodes is not None and self.max_nodes <= 0:
+            raise ValueError("max_nodes must be positive")
+        if self.move_time is None and self.max_nodes is None:
+            return self.search(search_grid, self.depth)
+
+        if self.move_time is not None:
+            self._deadline = time.monotonic() + self.move_time
+        if self.max_nodes is not None:
+            self._node_limit = self.max_nodes
         best_move = None
+        depth = self.start_depth(grid)
+        try:
+            while depth <= self.max_depth:
+                best_move = self.search(search_grid, depth)
+                depth += 2
+        except _OutOfBudget:
+            pass
+        finally:
+            self._deadline = self._node_limit = math.inf
+        if best_move is None:
+            # not even the first depth was completed
+            best_move = next(iter(helpers.get_valid_moves(grid)), None)
+        return best_move
+
+    def start_depth(self, grid) -> int:
+        """Return the depth the iterative deepening starts with"""
+        if not self.adaptive_depth:
+            return 2
+        # boards with few empty cells have few chance branches
+        empty = grid.empty_count
+        return 2 if empty > 4 else 4
 
+    def search(self, grid, depth):
+        """Return the best move found by a search to the given depth"""
+        if self.workers > 1:
+            return self.search_parallel(grid, depth)
+        best_value = -math.inf
+        best_move = None
         for direction in DIRECTION:
-            new_grid = deepcopy(grid)
-            move = MoveFactory.create(direction)
-            moved = new_grid.move(move, add_tile=False)
-            if not moved:
+            if not grid.make_move(direction):
                 continue
-            value = self.expectimax(new_grid, self.depth, False)
+            value = self.expectimax(grid, depth, False)
+            grid.unmake()
             if value > best_value:
                 best_value = value
                 best_move = direction
         return best_move
 
-    def expectimax(self, grid, depth, maximize):
-        if depth == 0 or grid.no_moves:
+    def search_parallel(self, grid, depth):
+        """Return the best move found by a search to the given depth.
+        The children of the root chance nodes (a tile spawned after each move)
+        are searched in the worker pool."""
+        tasks = []
+        weights = []
+        for direction in DIRECTION:
+            if not grid.make_move(direction):
+                continue
+            # a valid move always leaves an empty field
+            empty_fields = grid.get_empty_fields()
+            for field in empty_fields:
+                for tile, chance in self.spawns:
+                    grid.make_tile(*field, tile)
+                    probability = chance / len(empty_fields)
+                    tasks.append(
+                        (
+                            grid.exponents.copy(),
+                            grid.score,
+                            grid.moves,
+                            depth - 1,
+                            probability,
+                            self.table.generation,
+                            self._deadline,
+                            math.inf,  # the share of the budget is set below
+                        )
+                    )
+                    weights.append((direction, probability))
+                    grid.unmake()
+            grid.unmake()
+        if tasks and self._node_limit < math.inf:
+            # every task gets an equal share of the remaining nodes
+            share = max(int(self._node_limit - self.nodes) // len(tasks), 1)
+            tasks = [task[:-1] + (share,) for task in tasks]
+        values = dict.fromkeys((direction for direction, _ in weights), 0.0)
+        for (direction, probability), (value, nodes) in zip(
+            weights, self._get_pool().map(_search_task, tasks, chunksize=1)
+        ):
+            self.nodes += nodes
+            if value is None:
+                raise _OutOfBudget
+            values[direction] += probability * value
+        if self.nodes > self._node_limit:
+            raise _OutOfBudget
+        return max(values, key=values.get) if values else None  # type: ignore
+
+    def _get_pool(self):
+        """Return the worker pool, it is started on first use and kept
+        for the next moves"""
+        if self._pool is None:
+            settings = {name: getattr(self, name) for name in self.worker_settings}
+            self._pool = multiprocessing.Pool(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(
+                    type(self),
+                    type(self.grid),
+                    self.width,
+                    self.height,
+                    settings,
+                ),
+            )
+            # stop the workers when the player is dropped or at exit
+            self._finalizer = weakref.finalize(self, self._pool.terminate)
+        return self._pool
+
+    def close(self) -> None:
+        """Stop the worker pool"""
+        if self._pool is not None:
+            self._finalizer()
+            self._pool = None
+
+    def _count_node(self) -> None:
+        """Count a searched node and abort the search if the budget is used up"""
+        self.nodes += 1
+        if self.nodes > self._node_limit or (
+            self.nodes & 0x3F == 0 and time.monotonic() > self._deadline
+        ):
+            raise _OutOfBudget
+
+    def expectimax(self, grid, depth, maximize, probability=1.0):
+        self._count_node()
+        if depth == 0 or grid.no_moves or probability < self.min_probability:
             return self.evaluate(grid)
+        # the same node is often reached by different orders of moves and tiles
+        key = position_key(grid, not maximize)
+        entry = self.table.probe(key, depth)
+        if entry is not None:
+            return entry.value
+        best_move = None
         if maximize is True:
             best_value = -math.inf
             # iterate over all possible moves
             for direction in DIRECTION:
-                new_grid = deepcopy(grid)
-                move = MoveFactory.create(direction)
-                if new_grid.move(move, add_tile=False):
-                    value = self.expectimax(new_grid, depth - 1, False)
-                    best_value = max(best_value, value)
-            return best_value
+                if grid.make_move(direction):
+                    value = self.expectimax(grid, depth - 1, False, probability)
+                    grid.unmake()
+                    if value > best_value:
+                        best_value = value
+                        best_move = direction
         else:
-            # iterate over all empty fields and add a random tile
+            # iterate over all empty fields and all the tiles that can spawn there
             empty_fields = grid.get_empty_fields()
             if not empty_fields:
-                return self.expectimax(grid, depth - 1, True)
+                return self.expectimax(grid, depth - 1, True, probability)
 
-            values = []
+            best_value = 0.0
             for field in empty_fields:
-                new_grid = deepcopy(grid)
-                new_grid.put_random_tile(*field)
-                values.append(self.expectimax(new_grid, depth - 1, True))
-            return sum(values) / len(values)
+                for tile, chance in self.spawns:
+                    grid.make_tile(*field, tile)
+                    value = self.expectimax(
+                        grid,
+                        depth - 1,
+                        True,
+                        probability * chance / len(empty_fields),
+                    )
+                    grid.unmake()
+                    best_value += chance * value
+            best_value /= len(empty_fields)
+        self.table.store(key, depth, best_value, move=best_move)
+        return best_value
 
     def evaluate(self, grid, move: Move | None = None):
         """Return the score of the grid"""
-        zeros = helpers.zeros(grid) / (self.height * self.width)
-        max_tile = helpers.max_tile(grid)
-        high_on_edge = helpers.high_vals_on_edge(grid, max_tile // 2)
-        val = [
-            0.95 * math.log(high_on_edge if high_on_edge > 0 else 1),
-            0.51 * helpers.monotonicity(grid),
-            0.05 * helpers.smoothness(grid),
-            zeros * math.log2(max_tile),
-            grid.score / grid.moves if grid.moves > 0 else 0,
-        ]
-        return sum(val)
+        return self.cache.evaluate(grid, self._evaluate)
+
+    def _evaluate(self, grid) -> float:
+        return float(helpers.features(grid) @ self.weights)
+
+    def evaluate_batch(self, boards, score, moves):
+        """Return the scores of a stack of boards"""
+        return helpers.batch_features(boards, score, moves) @ self.weights
@@ -1,9 +1,10 @@
 """AI player using Monte Carlo simulation algorithm"""
 
-import math
 from copy import deepcopy
 from random import choice
 
+import numpy as np
+
 from grid2048 import DIRECTION, Grid2048, MoveFactory, helpers
 from players import AIPlayer
 
@@ -13,6 +14,16 @@ class MCSPlayer(AIPlayer):
 
     sim_length = 5  # maximum length to simulate
     sim_count = 200  # number of simulations to run for each move
+    # weights of the features and of the features scaled by the sum per move
+    weights = np.array(
+        [
+            helpers.feature_weights(high_on_edge_log=1, mean_per_max_log=4),
+            helpers.feature_weights(
+                monotonicity=2, smoothness=2, empty_max_log=0.5, max_log=0.05
+            ),
+        ]
+    )
+    sum_per_move = helpers.FEATURE_INDEX["sum_per_move"]
 
     def __init__(self, grid: Grid2048):
         super().__init__(grid)
@@ -27,12 +38,11 @@ class MCSPlayer(AIPlayer):
         # Initialize a dictionary to store the number of wins for each move
         wins = {direction: 0.0 for direction in DIRECTION}
 
-        for direction in DIRECTION:
+        for direction in helpers.get_valid_moves(grid):
             for _ in range(self.sim_count):
                 # Make a copy of the grid to simulate a move
                 sim_grid = deepcopy(grid)
-                move = MoveFactory.create(direction)
-                if sim_grid.move(move, add_tile=True):
+                if sim_grid.move(direction, add_tile=True):
                     wins[direction] += self.simulate(sim_grid)
         return max(wins, key=wins.get)  # type: ignore
 
@@ -43,26 +53,21 @@ class MCSPlayer(AIPlayer):
             sim_n += 1
             # select a random move
             direction = choice(list(DIRECTION))
-            move = MoveFactory.create(direction)
-            if not sim_grid.move(move, add_tile=True) or sim_grid.no_moves:
+            if not sim_grid.move(direction, add_tile=True) or sim_grid.no_moves:
                 break
         return self.evaluate(sim_grid)
 
     def evaluate(self, grid):
         """Return the score of the grid"""
-        val_mean = helpers.values_mean(grid)
-        zeros = helpers.zeros(grid) / (self.height * self.width)
-        grid_sum = helpers.grid_sum(grid)
-        sum_steps = grid_sum / grid.moves * 0.75 if grid.moves > 0 else 0
-        max_tile = helpers.max_tile(grid)
-        high_on_edge = helpers.high_vals_on_edge(grid, max_tile // 2)
+        features = helpers.features(grid)
+        base, scaled = self.weights @ features
+        sum_steps = features[self.sum_per_move] * 0.75
+        # The 0.1 * max_log term avoids zero scores for terminal states
+        return float(base + scaled * (sum_steps + 1))
 
-        # Avoid multiplying by zeros to prevent zero scores for terminal states
-        val = [
-            math.log(high_on_edge if high_on_edge > 0 else 1),
-            helpers.monotonicity(grid) * (sum_steps + 1) * 2,
-            helpers.smoothness(grid) * (sum_steps + 1) * 2,
-            (zeros + 0.1) * math.log2(max_tile) * (sum_steps + 1) / 2,
-            val_mean / math.log2(max_tile) * 4,
-        ]
-        return sum(val)
+    def evaluate_batch(self, boards, score, moves):
+        """Return the scores of a stack of boards"""
+        features = helpers.batch_features(boards, score, moves)
+        base, scaled = (features @ self.weights.T).T
+        sum_steps = features[:, self.sum_per_move] * 0.75
+        return base + scaled * (sum_steps + 1)
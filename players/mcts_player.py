@@ -4,6 +4,8 @@ import math
 from copy import deepcopy
 from random import choice
 
+import numpy as np
+
 from grid2048 import DIRECTION, Grid2048, Move, MoveFactory, helpers
 from players import AIPlayer
 
@@ -86,7 +88,7 @@ class MCTSNode:
     def expand(self):
         for direction in self.valid_moves:
             new_grid = deepcopy(self.grid)
-            new_grid.move(MoveFactory.create(direction), add_tile=True)
+            new_grid.move(direction, add_tile=True)
             # if empty := new_grid.get_empty_fields():
             #     for tile in empty:
             #         new_grid = deepcopy(new_grid)
@@ -102,7 +104,7 @@ class MCTSNode:
         while not grid.no_moves and (s < sim_l or sim_l < 0):
             s += 1
             direction = choice(list(DIRECTION))
-            grid.move(MoveFactory.create(direction), add_tile=True)
+            grid.move(direction, add_tile=True)
         return grid
 
 
@@ -110,6 +112,15 @@ class MCTSPlayer(AIPlayer):
     """AI player using Monte Carlo Tree Search algorithm"""
 
     sim_length = 150
+    weights = helpers.feature_weights(
+        high_on_edge_sqrt=1 / 2,
+        higher_on_edge_sqrt=1 / 4,
+        mono_max_log=1 / 5,
+        smoothness=3.5,
+        empty_max_log=3.5,
+        values_mean=1 / 7,
+        sum_per_move=1,
+    )
     # Length of the simulation. How many times the simulation is run
 
     rnd_steps = 2
@@ -158,23 +169,11 @@ class MCTSPlayer(AIPlayer):
 
     def evaluate(self, grid, move: Move | None = None) -> float:
         """Return the score of the grid"""
-        max_tile = helpers.max_tile(grid)
-        zeros = helpers.zeros(grid) * math.log2(max_tile) / helpers.grid_size(grid)
-        val_mean = helpers.values_mean(grid)
-        grid_sum = helpers.grid_sum(grid)
-        step_sum = grid_sum / grid.moves if grid.moves > 0 else 1
-        # max_in_corner = helpers.high_vals_in_corner(grid, max_tile)
-        high_on_edge = helpers.high_vals_on_edge(grid, max_tile // 2)
-        higher_on_edge = helpers.higher_on_edge(grid)
-        val = [
-            math.sqrt(high_on_edge) / 2,
-            math.sqrt(higher_on_edge) / 4,
-            # # math.sqrt(max_in_corner) * 0.25,
-            helpers.monotonicity(grid) * math.log2(max_tile) / 5,
-            helpers.smoothness(grid) * 3.5,
-            zeros * 3.5,
-            val_mean / 7,
-            step_sum,
-        ]
-        # print(val)
-        return sum(val)
+        value = float(helpers.features(grid) @ self.weights)
+        # the step sum counts as 1 before the first move
+        return value if grid.moves > 0 else value + 1
+
+    def evaluate_batch(self, boards, score, moves):
+        """Return the scores of a stack of boards"""
+        values = helpers.batch_features(boards, score, moves) @ self.weights
+        return values + (np.asarray(moves) == 0)
@@ -1,36 +1,97 @@
 """AI player using Minimax algorithm"""
 
 import math
+import time
 from copy import deepcopy
+from typing import Any
 
 from grid2048 import DIRECTION, Grid2048, Move, MoveFactory, helpers
 from players import AIPlayer
+from players.eval_cache import EvalCache
+from players.transposition import BOUND, TranspositionTable, position_key
+
+
+class _OutOfTime(Exception):
+    """Raised to abort a search when the time for the move is up"""
 
 
 class MinimaxPlayer(AIPlayer):
     """AI player using Minimax algorithm"""
 
     depth = 5
+    weights = helpers.feature_weights(
+        high_on_edge_log=0.95,
+        monotonicity=0.21,
+        smoothness=0.05,
+        empty_max_log=1,
+        score_per_move=1,
+    )
+    cache_size = 2**16  # evaluations kept between the searches
+    table_size = 2**18  # search results kept between the moves
+    tiles = (2, 4)  # tiles the adversary can put on an empty field
+    iterative = True  # search depth 1, 2, ... to order the moves of the next one
+    move_time: float | None = None  # seconds per move, deepen until the time is up
+    max_depth = 20  # depth limit of the timed search
 
     def __init__(self, grid: Grid2048):
         super().__init__(grid)
         self.height = self.grid.height
         self.width = self.grid.width
+        self.cache = EvalCache(self.cache_size)
+        self.table = TranspositionTable(self.table_size)
+        self.killers: dict[tuple[int, bool], list] = {}
+        self.history: dict[tuple[bool, Any], int] = {}
+        self.nodes = 0
+        self._root_depth = self.depth
+        self._deadline = math.inf
 
     def play(self, *args, **kwargs) -> bool:
         move = MoveFactory.create(self.get_best_move(self.grid))  # type: ignore
         return self.grid.move(move)
 
     def get_best_move(self, grid: Grid2048) -> DIRECTION | None:
+        # search on a single copy of the grid, moves are made and unmade in place
+        search_grid = deepcopy(grid)
+        self.table.new_search()
+        self.killers.clear()
+        for option in self.history:
+            self.history[option] //= 2  # older cut-offs count less
+        self.nodes = 0
+        if self.move_time is not None:
+            if self.move_time <= 0:
+                raise ValueError("move_time must be positive")
+            self._deadline = time.monotonic() + self.move_time
+        max_depth = self.depth if self.move_time is None else self.max_depth
+        best_move = None
+        try:
+            # the shallower searches fill the table with the moves to try first,
+            # a timed search always deepens to have a move when the time is up
+            iterative = self.iterative or self.move_time is not None
+            for depth in range(1 if iterative else max_depth, max_depth + 1):
+                best_move = self.search(search_grid, depth, best_move)
+        except _OutOfTime:
+            pass
+        finally:
+            self._deadline = math.inf
+        if best_move is None:
+            # not even the first depth was completed
+            best_move = next(iter(helpers.get_valid_moves(grid)), None)
+        return best_move
+
+    def search(
+        self, grid: Grid2048, depth: int, first: DIRECTION | None = None
+    ) -> DIRECTION | None:
+        """Return the best move searched to the given depth,
+        the first move is tried before the others"""
+        self._root_depth = depth
         best_score = -math.inf
         best_move = None
-        for direction in DIRECTION:
-            new_grid = deepcopy(grid)
-            move = MoveFactory.create(direction)
-            moved = new_grid.move(move, add_tile=False)
-            if not moved:
+        for direction in self.order(DIRECTION, 0, True, first):
+            if not grid.make_move(direction):
                 continue
-            score = self.minimax(new_grid, -math.inf, math.inf, self.depth, True)
+            # the worse moves only have to prove they are not better
+            score = self.minimax(grid, best_score, math.inf, depth, True)
+            grid.unmake()
             if score > best_score:
                 best_score = score
                 best_move = direction
@@ -40,49 +101,95 @@ class MinimaxPlayer(AIPlayer):
         self, grid: Grid2048, alpha: float, beta: float, depth: int, maximizing: bool
     ) -> float:
         """Return the best score for the grid"""
+        self.nodes += 1
+        if self.nodes & 0x3F == 0 and time.monotonic() > self._deadline:
+            raise _OutOfTime
         if depth == 0 or grid.no_moves:
             return self.evaluate(grid)
+        key = position_key(grid, not maximizing)
+        entry = self.table.probe(key, depth)
+        if entry is not None and (
+            entry.bound == BOUND.EXACT
+            or (entry.bound == BOUND.LOWER and entry.value >= beta)
+            or (entry.bound == BOUND.UPPER and entry.value <= alpha)
+        ):
+            return entry.value
 
+        window = alpha, beta
+        ply = self._root_depth - depth + 1
+        best_move = None
         if maximizing:
-            max_score = -math.inf
-            for direction in DIRECTION:
-                new_grid = deepcopy(grid)
-                move = MoveFactory.create(direction)
-                if not new_grid.move(move, add_tile=False):
+            best_score = -math.inf
+            first = self.table.best_move(key)
+            for direction in self.order(DIRECTION, ply, True, first):
+                if not grid.make_move(direction):
                     continue
-                score = self.minimax(new_grid, alpha, beta, depth - 1, False)
-                max_score = max(max_score, score)
+                score = self.minimax(grid, alpha, beta, depth - 1, False)
+                grid.unmake()
+                if score > best_score:
+                    best_score = score
+                    best_move = direction
                 alpha = max(alpha, score)
                 if beta <= alpha:  # beta cut-off
+                    self.cut_off(direction, ply, True, depth)
                     break
-            return max_score
         else:
-            min_score = math.inf
-            empty_fields = grid.get_empty_fields()
-            if not empty_fields:
+            empty_cells = grid.empty_cells.tolist()
+            if not empty_cells:
                 return self.minimax(grid, alpha, beta, depth - 1, True)
 
-            for field in empty_fields:
-                new_grid = deepcopy(grid)
-                new_grid.put_random_tile(*field)
-                score = self.minimax(new_grid, alpha, beta, depth - 1, True)
-                min_score = min(min_score, score)
+            best_score = math.inf
+            placements = [(cell, tile) for cell in empty_cells for tile in self.tiles]
+            for cell, tile in self.order(placements, ply, False):
+                grid.make_tile(*divmod(cell, self.width), tile)
+                score = self.minimax(grid, alpha, beta, depth - 1, True)
+                grid.unmake()
+                best_score = min(best_score, score)
                 beta = min(beta, score)
                 if beta <= alpha:  # alpha cut-off
+                    self.cut_off((cell, tile), ply, False, depth)
                     break
-            return min_score
+
+        if best_score <= window[0]:
+            bound = BOUND.UPPER
+        elif best_score >= window[1]:
+            bound = BOUND.LOWER
+        else:
+            bound = BOUND.EXACT
+        self.table.store(key, depth, best_score, bound, best_move)
+        return best_score
+
+    def order(self, options, ply: int, maximizing: bool, first=None) -> list:
+        """Return the options sorted by how likely they cause a cut-off:
+        the first one, the killers of the ply and then by history"""
+        killers = self.killers.get((ply, maximizing), ())
+        history = self.history
+
+        def rank(option):
+            return (
+                option != first,
+                option not in killers,
+                -history.get((maximizing, option), 0),
+            )
+
+        return sorted(options, key=rank)
+
+    def cut_off(self, option, ply: int, maximizing: bool, depth: int) -> None:
+        """Remember the option that caused a cut-off"""
+        killers = self.killers.setdefault((ply, maximizing), [])
+        if option not in killers:
+            killers.insert(0, option)
+            del killers[2:]
+        key = maximizing, option
+        self.history[key] = self.history.get(key, 0) + depth * depth
 
     def evaluate(self, grid: Grid2048, move: Move | None = None):
         """Return the score of the grid"""
-        val_mean = helpers.values_mean(grid)
-        zeros = helpers.zeros(grid) / (self.height * self.width)
-        max_tile = helpers.max_tile(grid)
-        high_on_edge = helpers.high_vals_on_edge(grid, max_tile // 2)
-        val = [
-            0.95 * math.log(high_on_edge if high_on_edge > 0 else 1),
-            0.21 * helpers.monotonicity(grid),
-            0.05 * helpers.smoothness(grid),
-            zeros * math.log2(max_tile),
-            grid.score / grid.moves if grid.moves > 0 else 0,
-        ]
-        return sum(val)
+        return self.cache.evaluate(grid, self._evaluate)
+
+    def _evaluate(self, grid) -> float:
+        return float(helpers.features(grid) @ self.weights)
+
+    def evaluate_batch(self, boards, score, moves):
+        """Return the scores of a stack of boards"""
+        return helpers.batch_features(boards, score, moves) @ self.weights
@@ -3,7 +3,9 @@
 from abc import ABC, abstractmethod
 from typing import Callable
 
-from grid2048.grid2048 import Grid2048, Move
+import numpy as np
+
+from grid2048.grid2048 import VALUES, Grid2048, Move
 
 
 class PlayerInterface(ABC):
@@ -19,6 +21,9 @@ class PlayerInterface(ABC):
         # move = MoveFactory.create(MOVES.UP)
         # return self.grid.move(move)
 
+    def close(self) -> None:
+        """Release the resources of the player, e.g. worker processes"""
+
 
 class AIPlayer(PlayerInterface):
     """Abstract base class for AI players"""
@@ -27,6 +32,21 @@ class AIPlayer(PlayerInterface):
     def evaluate(self, grid: Grid2048, move: Move | None = None):
         """Returns the score of the grid."""
 
+    def evaluate_batch(
+        self, boards: np.ndarray, score: np.ndarray, moves: np.ndarray
+    ) -> np.ndarray:
+        """Returns the scores of a stack of boards of tile exponents
+        (N, height, width) with their game scores and move counts."""
+        count, height, width = boards.shape
+        result = np.empty(count)
+        for i in range(count):
+            grid = Grid2048(width, height)
+            grid.data = VALUES[boards[i]]
+            grid.score = int(score[i])
+            grid.moves = int(moves[i])
+            result[i] = self.evaluate(grid)
+        return result
+
 
 class PlayerFactory:
     """Factory for creating players"""
@@ -1,4 +1,4 @@
-""" Random player class. Randomly chooses a direction and makes a move. """
+"""Random player class. Randomly chooses a direction and makes a move."""
 
 from random import choices
 
@@ -0,0 +1,127 @@
+"""Transposition table for the search players"""
+
+from enum import IntEnum
+from typing import NamedTuple
+
+import numpy as np
+
+from grid2048 import DIRECTION, Grid2048
+
+BOUND = IntEnum("BOUND", "EXACT LOWER UPPER")
+
+_MASK = (1 << 64) - 1
+# odd 64-bit constants mixing the score, the move count and the node type
+# into the board hash
+_SCORE_MIX = 0x9E37_79B9_7F4A_7C15
+_MOVES_MIX = 0xC2B2_AE3D_27D4_EB4F
+_CHANCE_MIX = 0x1656_67B1_9E37_79F9
+
+
+def position_key(grid: Grid2048, chance: bool = False) -> int:
+    """Return the 64-bit key of a search node.
+    The evaluations depend on the score and the number of moves, so they are
+    part of the key together with the board hash and the node type."""
+    key = grid.zobrist ^ (grid.score * _SCORE_MIX) ^ (grid.moves * _MOVES_MIX)
+    if chance:
+        key ^= _CHANCE_MIX
+    return key & _MASK
+
+
+class Entry(NamedTuple):
+    """Search result stored in the transposition table"""
+
+    value: float
+    depth: int
+    bound: BOUND
+    move: DIRECTION | None
+
+
+class TranspositionTable:
+    """Fixed size hash table of search results stored in NumPy arrays.
+    Every key maps to one slot. A slot is replaced by an entry of the same
+    or greater depth, or by any entry if it was stored by an older search,
+    so the table can be kept between the moves of a game."""
+
+    def __init__(self, size: int = 2**18):
+        if size <= 0 or size & (size - 1):
+            raise ValueError("Table size must be a positive power of two")
+        self.size = size
+        self._mask = size - 1
+        self.keys = np.zeros(size, dtype=np.uint64)
+        self.values = np.zeros(size, dtype=np.float64)
+        self.depths = np.zeros(size, dtype=np.int8)
+        self.bounds = np.zeros(size, dtype=np.uint8)  # 0 for empty slots
+        self.moves = np.zeros(size, dtype=np.uint8)  # 0 for no move
+        self.generations = np.zeros(size, dtype=np.uint8)
+        self.generation = 1
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.bounds))
+
+    def __repr__(self):
+        return f"TranspositionTable({self.size})"
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the table"""
+        arrays = (self.keys, self.values, self.depths, self.bounds, self.moves)
+        return sum(a.nbytes for a in arrays) + self.generations.nbytes
+
+    def new_search(self) -> None:
+        """Start a new search, the entries of the previous ones get older"""
+        self.generation = self.generation % 255 + 1
+
+    def probe(self, key: int, depth: int) -> Entry | None:
+        """Return the entry of the key searched at least to the given depth"""
+        slot = key & self._mask
+        if self.bounds[slot] and self.keys[slot] == key and self.depths[slot] >= depth:
+            self.hits += 1
+            move = int(self.moves[slot])
+            return Entry(
+                float(self.values[slot]),
+                int(self.depths[slot]),
+                BOUND(self.bounds[slot]),
+                DIRECTION(move) if move else None,
+            )
+        self.misses += 1
+        return None
+
+    def best_move(self, key: int) -> DIRECTION | None:
+        """Return the best move stored for the key at any depth"""
+        slot = key & self._mask
+        if self.bounds[slot] and self.keys[slot] == key and self.moves[slot]:
+            return DIRECTION(int(self.moves[slot]))
+        return None
+
+    def store(
+        self,
+        key: int,
+        depth: int,
+        value: float,
+        bound: BOUND = BOUND.EXACT,
+        move: DIRECTION | None = None,
+    ) -> None:
+        """Store a search result, unless the slot holds a deeper result
+        of the current search"""
+        slot = key & self._mask
+        if (
+            self.bounds[slot]
+            and self.generations[slot] == self.generation
+            and self.depths[slot] > depth
+        ):
+            return
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.depths[slot] = depth
+        self.bounds[slot] = bound
+        self.moves[slot] = move.value if move is not None else 0
+        self.generations[slot] = self.generation
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the statistics"""
+        self.bounds[:] = 0
+        self.generation = 1
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,81 @@
+"""Unit tests for the BatchGrid2048 class using unittest framework."""
+
+import unittest
+
+import numpy as np
+from grid2048.batch import BatchGrid2048
+from grid2048.grid2048 import DIRECTION, Grid2048, MoveFactory
+
+
+class TestBatchGrid2048(unittest.TestCase):
+    """Test cases for BatchGrid2048 class."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.grid = Grid2048(4, 4)
+        self.grid.data = np.array(
+            [
+                [2, 0, 0, 2],
+                [2, 2, 0, 0],
+                [4, 0, 2, 0],
+                [0, 0, 0, 4],
+            ]
+        )
+        self.batch = BatchGrid2048.from_grid(self.grid, 4, seed=0)
+
+    def test_initialization(self):
+        """Test batch initialization."""
+        batch = BatchGrid2048(10, 3, 5, seed=0)
+        self.assertEqual(batch.data.shape, (10, 5, 3))
+        self.assertEqual(batch.exponents.dtype, np.uint8)
+        np.testing.assert_array_equal(np.count_nonzero(batch.data, axis=(1, 2)), 2)
+        with self.assertRaises(ValueError):
+            BatchGrid2048(0)
+
+    def test_move_matches_grid2048(self):
+        """Test that every board moves like a single Grid2048."""
+        valid = self.batch.move(list(DIRECTION), add_tile=False)
+        self.assertTrue(valid.all())
+        for i, direction in enumerate(DIRECTION):
+            grid = Grid2048(4, 4)
+            grid.data = self.grid.data.copy()
+            grid.move(MoveFactory.create(direction), add_tile=False)
+            np.testing.assert_array_equal(self.batch.data[i], grid.data)
+            self.assertEqual(self.batch.score[i], grid.score)
+        np.testing.assert_array_equal(self.batch.moves, 1)
+
+    def test_direction_codes(self):
+        """Test the accepted forms of the directions."""
+        codes = [d.value for d in DIRECTION]
+        for directions in (np.array(list(DIRECTION)), np.array(codes), codes):
+            batch = BatchGrid2048.from_grid(self.grid, 4, seed=0)
+            self.assertTrue(batch.move(directions, add_tile=False).all())
+        for directions in ([0, 1, 2, 3], np.array([1, 2, 3, 5]), ["UP"] * 4):
+            with self.assertRaises(ValueError):
+                self.batch.move(directions)
+
+    def test_add_random_tiles(self):
+        """Test adding tiles only to the selected boards."""
+        empty = self.batch.empty_counts()
+        self.batch.add_random_tiles(np.array([True, False, True, False]))
+        np.testing.assert_array_equal(self.batch.empty_counts(), empty - [1, 0, 1, 0])
+
+    def test_no_moves(self):
+        """Test terminal detection for every board."""
+        data = self.batch.data
+        data[1] = np.array([[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]])
+        self.batch.data = data
+        np.testing.assert_array_equal(self.batch.no_moves, [False, True, False, False])
+        valid = self.batch.move(DIRECTION.LEFT)
+        self.assertFalse(valid[1])
+
+    def test_to_grid(self):
+        """Test extracting a single board."""
+        self.batch.move(DIRECTION.RIGHT, add_tile=False)
+        grid = self.batch.to_grid(0)
+        self.assertEqual(grid.score, 8)
+        self.assertEqual(grid.moves, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""Unit tests for the Bitboard2048 class using unittest framework."""
+
+import unittest
+from copy import deepcopy
+
+import numpy as np
+from grid2048.bitboard import Bitboard2048, count_empty, transpose
+from grid2048.grid2048 import DIRECTION, Grid2048, MoveFactory
+
+
+class TestBitboard2048(unittest.TestCase):
+    """Test cases for Bitboard2048 class."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.data = np.array(
+            [
+                [2, 0, 0, 2],
+                [2, 2, 0, 0],
+                [4, 0, 2, 0],
+                [0, 0, 0, 4],
+            ]
+        )
+        self.board = Bitboard2048()
+        self.board.data = self.data
+
+    def test_initialization(self):
+        """Test board initialization."""
+        board = Bitboard2048()
+        self.assertEqual(board.score, 0)
+        self.assertEqual(board.moves, 0)
+        self.assertEqual(np.count_nonzero(board.data), 2)
+        with self.assertRaises(ValueError):
+            Bitboard2048(3, 4)
+
+    def test_data_round_trip(self):
+        """Test that data is packed and unpacked without changes."""
+        np.testing.assert_array_equal(self.board.data, self.data)
+        self.assertEqual(self.board[2, 0], 4)
+        np.testing.assert_array_equal(self.board.exponents[0], [1, 0, 0, 1])
+
+    def test_transpose(self):
+        """Test transposing the packed board."""
+        board = Bitboard2048()
+        board.board = transpose(self.board.board)
+        np.testing.assert_array_equal(board.data, self.data.T)
+
+    def test_count_empty(self):
+        """Test counting empty cells."""
+        self.assertEqual(count_empty(self.board.board), 9)
+        self.assertEqual(count_empty(0), 16)
+
+    def test_last_move(self):
+        """Test the last move of moves made with a DIRECTION."""
+        other = deepcopy(self.board)
+        self.assertTrue(self.board.move(DIRECTION.LEFT, add_tile=False))
+        self.assertTrue(other.move(DIRECTION.RIGHT, add_tile=False))
+        self.assertEqual(self.board.last_move.direction, DIRECTION.LEFT)
+        self.assertEqual(self.board.last_move.score, 8)
+        self.assertTrue(self.board.last_move.is_valid)
+        self.assertIs(self.board.last_move, self.board.last_move)
+        self.assertEqual(other.last_move.direction, DIRECTION.RIGHT)
+
+    def test_moves_match_grid2048(self):
+        """Test that every move gives the same result as Grid2048."""
+        for direction in DIRECTION:
+            grid = Grid2048(4, 4)
+            grid.data = self.data.copy()
+            board = deepcopy(self.board)
+            self.assertTrue(board.move(MoveFactory.create(direction), add_tile=False))
+            grid.move(MoveFactory.create(direction), add_tile=False)
+            np.testing.assert_array_equal(board.data, grid.data)
+            self.assertEqual(board.score, grid.score)
+
+    def test_preview(self):
+        """Test that a preview does not change the board."""
+        board = self.board.board
+        preview = self.board.preview(DIRECTION.RIGHT)
+        self.assertTrue(preview.is_valid)
+        self.assertEqual(preview.score, 8)
+        self.assertEqual(preview.data[2, 3], 2)
+        self.assertEqual(self.board.board, board)
+
+    def test_make_unmake(self):
+        """Test making and reverting moves and tiles in place."""
+        board = self.board.board
+        self.assertTrue(self.board.make_move(DIRECTION.RIGHT))
+        self.board.make_tile(0, 0, 2)
+        self.assertEqual(self.board[0, 0], 2)
+        self.assertEqual(self.board.score, 8)
+        self.board.unmake()
+        self.board.unmake()
+        self.assertEqual(self.board.board, board)
+        self.assertEqual(self.board.score, 0)
+        self.assertEqual(self.board.moves, 0)
+        for row, col, value in ((1, -1, 2), (0, 4, 2), (0, 1, 3), (0, 1, 2**16)):
+            with self.assertRaises(ValueError):
+                self.board.make_tile(row, col, value)
+        self.assertEqual(self.board.board, board)
+
+    def test_no_moves_detection(self):
+        """Test detection of no available moves."""
+        self.board.data = np.array(
+            [[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]]
+        )
+        self.assertTrue(self.board.no_moves)
+        self.assertFalse(self.board.move(MoveFactory.create(DIRECTION.LEFT)))
+
+        self.board[0, 0] = 4
+        self.assertFalse(self.board.no_moves)
+
+    def test_zobrist(self):
+        """Test that the hash follows the packed board."""
+        self.assertEqual(self.board.zobrist, self.board.board)
+        self.board.make_move(DIRECTION.RIGHT)
+        self.assertEqual(self.board.zobrist, self.board.board)
+
+    def test_seeded_spawns(self):
+        """Test that seeded boards spawn the same tiles."""
+        boards = [Bitboard2048(seed=7) for _ in range(2)]
+        for _ in range(20):
+            for board in boards:
+                board.move(MoveFactory.create(DIRECTION.RIGHT))
+                board.move(MoveFactory.create(DIRECTION.DOWN))
+        self.assertEqual(boards[0].board, boards[1].board)
+
+    def test_deepcopy(self):
+        """Test that a copy does not share the board with the original."""
+        board = deepcopy(self.board)
+        board.move(MoveFactory.create(DIRECTION.UP))
+        np.testing.assert_array_equal(self.board.data, self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
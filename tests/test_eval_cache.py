@@ -0,0 +1,75 @@
+"""Unit tests for the evaluation cache of the AI players."""
+
+import unittest
+
+import numpy as np
+from grid2048.bitboard import Bitboard2048
+from grid2048.grid2048 import DIRECTION, Grid2048
+from players.eval_cache import EvalCache, board_key
+
+
+class TestEvalCache(unittest.TestCase):
+    """Test cases for the EvalCache class."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.grid = Grid2048(4, 4)
+        self.grid.data = np.array(
+            [
+                [2, 0, 0, 2],
+                [2, 2, 0, 0],
+                [4, 0, 2, 0],
+                [0, 0, 0, 4],
+            ]
+        )
+        self.calls = 0
+
+    def evaluate(self, grid):
+        self.calls += 1
+        return float(grid.score)
+
+    def test_hits_and_misses(self):
+        """Test that repeated grids are evaluated once."""
+        cache = EvalCache(8)
+        self.assertEqual(cache.evaluate(self.grid, self.evaluate), 0)
+        self.assertEqual(cache.evaluate(self.grid, self.evaluate), 0)
+        self.grid.make_move(DIRECTION.LEFT)
+        self.assertEqual(cache.evaluate(self.grid, self.evaluate), 8)
+        self.grid.unmake()
+        cache.evaluate(self.grid, self.evaluate)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(cache.info(), (2, 2, 8, 2))
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 8, 0))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is dropped."""
+        cache = EvalCache(2)
+        grids = []
+        for direction in (DIRECTION.LEFT, DIRECTION.RIGHT, DIRECTION.UP):
+            grid = Grid2048(4, 4)
+            grid.data = self.grid.data.copy()
+            grid.move(direction, add_tile=False)
+            grids.append(grid)
+        cache.evaluate(grids[0], self.evaluate)
+        cache.evaluate(grids[1], self.evaluate)
+        cache.evaluate(grids[0], self.evaluate)
+        cache.evaluate(grids[2], self.evaluate)
+        self.assertEqual(len(cache), 2)
+        cache.evaluate(grids[0], self.evaluate)
+        self.assertEqual(self.calls, 3)
+        cache.evaluate(grids[1], self.evaluate)
+        self.assertEqual(self.calls, 4)
+        with self.assertRaises(ValueError):
+            EvalCache(0)
+
+    def test_board_key(self):
+        """Test the keys of the grids and bitboards."""
+        board = Bitboard2048()
+        board.data = self.grid.data
+        self.assertEqual(board_key(board), board.board)
+        self.assertEqual(board_key(self.grid), self.grid.exponents.tobytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
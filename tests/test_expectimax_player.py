@@ -0,0 +1,141 @@
+"""Unit tests for the search of the expectimax player."""
+
+import random
+import time
+import unittest
+
+import numpy as np
+from grid2048.grid2048 import DIRECTION, Grid2048
+from players.expectimax_player import ExpectimaxPlayer
+
+
+class TestExpectimaxPlayer(unittest.TestCase):
+    """Test cases for the ExpectimaxPlayer class."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        random.seed(0)
+        self.grids = []
+        for seed in range(8):
+            grid = Grid2048(4, 4, seed=seed)
+            for _ in range(random.randrange(80)):
+                if grid.no_moves:
+                    break
+                grid.move(random.choice(list(DIRECTION)))
+            if not grid.no_moves:
+                self.grids.append(grid)
+
+    def test_chance_node_weights(self):
+        """Test that a chance node averages the spawns by their probability."""
+        grid = Grid2048(4, 4)
+        grid.data = np.array(
+            [[2, 4, 8, 16], [32, 64, 128, 256], [4, 8, 16, 32], [2, 0, 0, 8]]
+        )
+        player = ExpectimaxPlayer(grid)
+        expected = 0.0
+        for row, col in grid.get_empty_fields():
+            for tile, chance in ((2, 0.9), (4, 0.1)):
+                grid.make_tile(row, col, tile)
+                expected += chance / 2 * player.evaluate(grid)
+                grid.unmake()
+        self.assertAlmostEqual(player.expectimax(grid, 1, False), expected)
+
+    def test_min_probability(self):
+        """Test that unlikely branches are evaluated instead of searched."""
+        grid = Grid2048(4, 4)
+        grid.data = np.array([[2, 0, 0, 0], [0, 4, 0, 0], [0, 0, 0, 0], [0, 0, 0, 2]])
+        player = ExpectimaxPlayer(grid)
+        player.min_probability = 0.5
+        self.assertEqual(
+            player.expectimax(grid, 3, True, probability=0.4), player.evaluate(grid)
+        )
+        # every spawn is less likely than the threshold, so below the chance
+        # nodes of the root moves only the spawned grids are evaluated
+        expected = 1
+        for direction in DIRECTION:
+            if grid.make_move(direction):
+                expected += 1 + 2 * grid.empty_count
+                grid.unmake()
+        player.nodes = 0
+        player.expectimax(grid, 3, True)
+        self.assertEqual(player.nodes, expected)
+
+    def test_node_budget(self):
+        """Test that a node budget returns the move of the last completed depth."""
+        grid = self.grids[0]
+        fixed = ExpectimaxPlayer(grid)
+        fixed.depth = 2
+        move = fixed.get_best_move(grid)
+        player = ExpectimaxPlayer(grid)
+        player.max_nodes = fixed.nodes + 10
+        self.assertEqual(player.get_best_move(grid), move)
+        # the next depth was started and aborted
+        self.assertGreater(player.nodes, fixed.nodes)
+        self.assertLessEqual(player.nodes, player.max_nodes + 1)
+
+    def test_time_budget(self):
+        """Test that a time budget limits the time per move."""
+        player = ExpectimaxPlayer(self.grids[0])
+        player.move_time = 0.05
+        for grid in self.grids:
+            start = time.monotonic()
+            self.assertIsNotNone(player.get_best_move(grid))
+            self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_invalid_budget(self):
+        """Test that budgets must be positive."""
+        grid = self.grids[0]
+        for name in ("move_time", "max_nodes"):
+            player = ExpectimaxPlayer(grid)
+            setattr(player, name, 0)
+            with self.assertRaises(ValueError):
+                player.get_best_move(grid)
+
+    def test_adaptive_depth(self):
+        """Test that boards with few empty cells start deeper."""
+        grid = Grid2048(4, 4)
+        grid.data = np.array(
+            [[2, 4, 8, 16], [32, 64, 128, 256], [4, 8, 16, 32], [2, 0, 0, 8]]
+        )
+        player = ExpectimaxPlayer(grid)
+        self.assertEqual(player.start_depth(grid), 2)
+        player.adaptive_depth = True
+        self.assertEqual(player.start_depth(grid), 4)
+        self.assertEqual(player.start_depth(Grid2048(4, 4)), 2)
+
+    def test_workers(self):
+        """Test that the worker pool finds the moves of the serial search."""
+        serial = ExpectimaxPlayer(self.grids[0])
+        serial.depth = 2
+        player = ExpectimaxPlayer(self.grids[0])
+        player.depth, player.workers = 2, 2
+        try:
+            for grid in self.grids[:3]:
+                self.assertEqual(player.get_best_move(grid), serial.get_best_move(grid))
+            pool = player._pool  # pylint: disable=protected-access
+        finally:
+            player.close()
+        self.assertIsNone(player._pool)  # pylint: disable=protected-access
+        with self.assertRaises(ValueError):
+            pool.apply(len, ([],))
+
+    def test_workers_node_budget(self):
+        """Test that the node budget is shared by the tasks of the workers."""
+        grid = self.grids[0]
+        player = ExpectimaxPlayer(grid)
+        player.workers, player.max_nodes = 2, 500
+        tasks = 0
+        for direction in DIRECTION:
+            if grid.make_move(direction):
+                tasks += 2 * grid.empty_count
+                grid.unmake()
+        try:
+            self.assertIsNotNone(player.get_best_move(grid))
+        finally:
+            player.close()
+        # every task stops one node after its share
+        self.assertLessEqual(player.nodes, player.max_nodes + tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()
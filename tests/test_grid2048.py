@@ -1,8 +1,17 @@
 """Unit tests for the Grid2048 class using unittest framework."""
 
 import unittest
+from copy import deepcopy
 import numpy as np
-from grid2048.grid2048 import Grid2048, Move, MoveFactory, STATE, DIRECTION
+from grid2048.grid2048 import (
+    VALUES,
+    Grid2048,
+    Move,
+    MoveFactory,
+    STATE,
+    DIRECTION,
+    shift,
+)
 
 
 class TestGrid2048(unittest.TestCase):
@@ -75,6 +84,70 @@ class TestGrid2048(unittest.TestCase):
         self.assertIn((0, 1), empty_fields)  # Check some specific empty positions
         self.assertIn((0, 2), empty_fields)
 
+    def test_exponents(self):
+        """Test the exponent storage behind the tile values."""
+        self.assertEqual(self.simple_grid.exponents.dtype, np.uint8)
+        np.testing.assert_array_equal(self.simple_grid.exponents[0], [1, 0, 0, 1])
+        self.assertEqual(self.simple_grid[2, 0], 4)
+        self.simple_grid[3, 0] = 1024
+        self.assertEqual(self.simple_grid.exponents[3, 0], 10)
+        self.assertEqual(self.simple_grid.data[3, 0], 1024)
+        with self.assertRaises(ValueError):
+            self.simple_grid[0, 1] = 3
+        with self.assertRaises(ValueError):
+            self.simple_grid.data = np.full((4, 4), 6)
+        with self.assertRaises(ValueError):
+            self.simple_grid.data[0, 0] = 2
+
+    def test_empty_cells_index(self):
+        """Test that the empty cells index follows grid changes."""
+        self.assertEqual(self.simple_grid.empty_count, 9)
+        self.assertEqual(
+            sorted(self.simple_grid.empty_cells), [1, 2, 6, 7, 9, 11, 12, 13, 14]
+        )
+        self.simple_grid.move(MoveFactory.create(DIRECTION.RIGHT), add_tile=False)
+        self.assertEqual(self.simple_grid.empty_count, 11)
+        self.simple_grid.add_random_tile()
+        self.assertEqual(self.simple_grid.empty_count, 10)
+        np.testing.assert_array_equal(
+            np.sort(self.simple_grid.empty_cells),
+            np.flatnonzero(self.simple_grid.data == 0),
+        )
+        with self.assertRaises(ValueError):
+            self.simple_grid.empty_cells[0] = 0
+
+    def test_seeded_spawns(self):
+        """Test that seeded grids spawn the same tiles."""
+        grids = [Grid2048(4, 4, seed=42) for _ in range(2)]
+        np.testing.assert_array_equal(grids[0].data, grids[1].data)
+        for _ in range(20):
+            for grid in grids:
+                grid.move(MoveFactory.create(DIRECTION.LEFT))
+                grid.move(MoveFactory.create(DIRECTION.UP))
+        np.testing.assert_array_equal(grids[0].data, grids[1].data)
+        grid = Grid2048(4, 4, seed=np.random.default_rng(42))
+        np.testing.assert_array_equal(grid.data, Grid2048(4, 4, seed=42).data)
+
+    def test_deepcopy_spawns(self):
+        """Test that spawns on a copy don't change the original's stream."""
+        grid = Grid2048(4, 4, seed=1)
+        other = Grid2048(4, 4, seed=1)
+        clone = deepcopy(grid)
+        for _ in range(5):
+            clone.add_random_tile()
+        grid.add_random_tile()
+        other.add_random_tile()
+        np.testing.assert_array_equal(grid.data, other.data)
+
+        # copies of seeded grids spawn the same tiles, successive forks differ
+        clones = [deepcopy(Grid2048(4, 4, seed=2)) for _ in range(2)]
+        for clone in clones:
+            clone.add_random_tile()
+        np.testing.assert_array_equal(clones[0].data, clones[1].data)
+        spawner = grid.spawner
+        draws = [spawner.fork().draw(1000) for _ in range(2)]
+        self.assertNotEqual(draws[0], draws[1])
+
     def test_put_random_tile(self):
         """Test putting a random tile."""
         self.empty_grid.put_random_tile(0, 0)
@@ -124,6 +197,79 @@ class TestGrid2048(unittest.TestCase):
         self.assertEqual(move.score, 8)  # 2+2=4, 2+2=4, so total score is 8
         self.assertEqual(self.simple_grid.score, 8)
 
+    def test_preview(self):
+        """Test previewing a move without changing the grid."""
+        original = self.simple_grid.data.copy()
+        preview = self.simple_grid.preview(DIRECTION.RIGHT)
+        expected = np.array([[0, 0, 0, 4], [0, 0, 0, 4], [0, 0, 4, 2], [0, 0, 0, 4]])
+        np.testing.assert_array_equal(preview.data, expected)
+        self.assertEqual(preview.score, 8)
+        self.assertTrue(preview.is_valid)
+        np.testing.assert_array_equal(self.simple_grid.data, original)
+        self.assertEqual(self.simple_grid.score, 0)
+
+    def test_successors(self):
+        """Test previewing moves in all directions."""
+        grid = Grid2048(2, 2)
+        grid.data = np.array([[2, 4], [0, 0]])
+        successors = grid.successors()
+        self.assertEqual([p.direction for p in successors], list(DIRECTION))
+        self.assertEqual([p.is_valid for p in successors], [False, True, False, False])
+
+    def test_make_unmake_move(self):
+        """Test making and reverting a move in place."""
+        original = self.simple_grid.data.copy()
+        self.assertTrue(self.simple_grid.make_move(DIRECTION.RIGHT))
+        self.assertEqual(self.simple_grid.score, 8)
+        self.assertEqual(self.simple_grid.moves, 1)
+        self.assertTrue(self.simple_grid.make_move(DIRECTION.UP))
+        self.simple_grid.unmake()
+        self.simple_grid.unmake()
+        np.testing.assert_array_equal(self.simple_grid.data, original)
+        self.assertEqual(self.simple_grid.score, 0)
+        self.assertEqual(self.simple_grid.moves, 0)
+
+        # Invalid moves are not recorded
+        grid = Grid2048(2, 2)
+        grid.data = np.array([[2, 4], [4, 2]])
+        self.assertFalse(grid.make_move(DIRECTION.LEFT))
+        with self.assertRaises(ValueError):
+            grid.unmake()
+
+    def test_make_unmake_tile(self):
+        """Test placing and removing a tile in place."""
+        self.simple_grid.make_tile(0, 1, 4)
+        self.assertEqual(self.simple_grid[0, 1], 4)
+        self.simple_grid.make_tile(0, 2)
+        self.assertIn(self.simple_grid[0, 2], [2, 4])
+        self.simple_grid.unmake()
+        self.simple_grid.unmake()
+        self.assertEqual(self.simple_grid[0, 1], 0)
+        self.assertEqual(self.simple_grid[0, 2], 0)
+        with self.assertRaises(ValueError):
+            self.simple_grid.make_tile(0, 0, 2)
+        for row, col, value in ((1, -1, 2), (4, 0, 2), (0, 1, 3), (0, 1, 1)):
+            with self.assertRaises(ValueError):
+                self.simple_grid.make_tile(row, col, value)
+        self.assertEqual(self.simple_grid[0, 1], 0)
+
+    def test_zobrist(self):
+        """Test that the hash follows moves, spawns and reverts."""
+        grid = self.simple_grid
+        start = grid.zobrist
+        grid.make_move(DIRECTION.RIGHT)
+        grid.make_tile(0, 0, 2)
+        grid.move(DIRECTION.DOWN)
+        other = Grid2048(4, 4)
+        other.data = grid.data.copy()
+        self.assertEqual(grid.zobrist, other.zobrist)
+        self.assertNotEqual(grid.zobrist, start)
+        grid.make_move(DIRECTION.UP)
+        grid.unmake()
+        self.assertEqual(grid.zobrist, other.zobrist)
+        grid.data = np.zeros((4, 4), dtype=int)
+        self.assertEqual(grid.zobrist, 0)
+
     def test_no_moves_detection(self):
         """Test detection of no available moves."""
         grid = Grid2048(2, 2)
@@ -135,6 +281,18 @@ class TestGrid2048(unittest.TestCase):
         grid.data = np.array([[2, 2], [4, 2]])
         self.assertFalse(grid.no_moves)
 
+    def test_no_moves_cache(self):
+        """Test that the cached no moves result follows grid changes."""
+        grid = Grid2048(2, 2)
+        grid.data = np.array([[2, 4], [4, 0]])
+        self.assertFalse(grid.no_moves)
+        grid.make_tile(1, 1, 2)
+        self.assertTrue(grid.no_moves)
+        grid.unmake()
+        self.assertFalse(grid.no_moves)
+        grid[1, 1] = 2
+        self.assertTrue(grid.no_moves)
+
     def test_move_validation(self):
         """Test move validation."""
         # Valid move
@@ -147,6 +305,56 @@ class TestGrid2048(unittest.TestCase):
         move = MoveFactory.create(DIRECTION.RIGHT)
         self.assertFalse(grid.move(move))
 
+    def test_move_direction(self):
+        """Test moving with a DIRECTION instead of a Move."""
+        grid = Grid2048(4, 4)
+        grid.data = self.simple_grid.data.copy()
+        move = MoveFactory.create(DIRECTION.RIGHT)
+        self.simple_grid.move(move, add_tile=False)
+        self.assertTrue(grid.move(DIRECTION.RIGHT, add_tile=False))
+        np.testing.assert_array_equal(grid.data, self.simple_grid.data)
+        self.assertEqual(grid.score, self.simple_grid.score)
+        self.assertEqual(grid.last_move.direction, DIRECTION.RIGHT)
+        self.assertTrue(grid.last_move.is_valid)
+
+    def test_shift_kernel(self):
+        """Test the stateless shift kernel."""
+        data = self.simple_grid.exponents.copy()
+        self.assertEqual(shift(data, DIRECTION.RIGHT), (8, True))
+        self.assertEqual(data[0, 3], 2)
+        self.assertEqual(shift(data, DIRECTION.RIGHT), (0, False))
+
+    def test_move_call_updates_grid(self):
+        """Test that calling a Move directly keeps the grid's caches up to date."""
+        grid = self.simple_grid
+        _ = grid.data, grid.zobrist, grid.no_moves, grid.empty_cells
+        move = MoveFactory.create(DIRECTION.LEFT)
+        move(grid)
+        self.assertTrue(move.is_valid)
+        rebuilt = Grid2048(4, 4)
+        rebuilt.data = VALUES[grid.exponents]
+        np.testing.assert_array_equal(grid.data, rebuilt.data)
+        self.assertEqual(grid.zobrist, rebuilt.zobrist)
+        np.testing.assert_array_equal(grid.empty_cells, rebuilt.empty_cells)
+        self.assertEqual(grid.no_moves, rebuilt.no_moves)
+
+    def test_last_move_per_grid(self):
+        """Test that the last move belongs to its grid."""
+        grid = Grid2048(4, 4)
+        grid.data = self.simple_grid.data.copy()
+        self.assertTrue(grid.move(DIRECTION.LEFT, add_tile=False))
+        self.assertTrue(self.simple_grid.move(DIRECTION.LEFT, add_tile=False))
+        self.assertFalse(self.simple_grid.move(DIRECTION.LEFT, add_tile=False))
+        move = MoveFactory.create(DIRECTION.LEFT)
+        self.assertIsNot(move, MoveFactory.create(DIRECTION.LEFT))
+        self.assertEqual(grid.last_move.score, 8)
+        self.assertTrue(grid.last_move.is_valid)
+        self.assertFalse(self.simple_grid.last_move.is_valid)
+        with self.assertRaises(ValueError):
+            _ = move.is_valid
+        with self.assertRaises(ValueError):
+            MoveFactory.create(STATE.IDLE)
+
     def test_last_move(self):
         """Test last move tracking."""
         with self.assertRaises(ValueError):
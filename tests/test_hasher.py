@@ -0,0 +1,111 @@
+"""Unit tests for the grid keys."""
+
+import unittest
+
+import numpy as np
+from grid2048.bitboard import Bitboard2048
+from grid2048.grid2048 import DIRECTION, VALUES, Grid2048
+from grid2048.hasher import Hasher, decode, encode, format_key, parse_key
+
+
+class TestHasher(unittest.TestCase):
+    """Test cases for the Hasher class."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.data = np.array(
+            [
+                [2, 0, 0, 2],
+                [2, 2, 0, 0],
+                [4, 0, 2, 0],
+                [0, 0, 0, 2**31],
+            ]
+        )
+        self.grid = Grid2048(4, 4)
+        self.grid.data = self.data
+
+    def test_round_trip(self):
+        """Test that keys are converted back to the same grid."""
+        hasher = Hasher(self.grid)
+        key = hasher.key()
+        self.assertIsInstance(key, int)
+        np.testing.assert_array_equal(Hasher.dehash(key), self.data)
+        np.testing.assert_array_equal(Hasher.dehash(hasher.to_bytes()), self.data)
+        self.assertEqual(Hasher.from_key(key), hasher)
+        board = Hasher.dehash(Hasher([[2, 4, 8]]).key())
+        np.testing.assert_array_equal(board, [[2, 4, 8]])
+
+    def test_sources(self):
+        """Test that grids, bitboards, arrays and lists give the same key."""
+        key = Hasher(self.grid).key()
+        self.assertEqual(Hasher(self.data).key(), key)
+        self.assertEqual(Hasher(self.data.tolist()).key(), key)
+        self.assertEqual(hash(Hasher(self.data)), hash(Hasher(self.grid)))
+        board = Bitboard2048()
+        board.data = np.minimum(self.data, 2**15)
+        self.assertEqual(Hasher(board), Hasher(np.minimum(self.data, 2**15)))
+
+    def test_dimensions(self):
+        """Test that the dimensions are part of the key."""
+        self.assertNotEqual(
+            Hasher(np.zeros((2, 3), dtype=int)).key(),
+            Hasher(np.zeros((3, 2), dtype=int)).key(),
+        )
+        np.testing.assert_array_equal(
+            Hasher.dehash(Hasher(np.zeros((3, 2), dtype=int)).key()), np.zeros((3, 2))
+        )
+
+    def test_batch_round_trip(self):
+        """Test encoding and decoding stacks of boards."""
+        boards = np.random.default_rng(0).integers(0, 32, (50, 3, 5), dtype=np.uint8)
+        keys = encode(boards)
+        np.testing.assert_array_equal(decode(keys), boards)
+        self.assertEqual(keys[0].tobytes(), Hasher(VALUES[boards[0]]).to_bytes())
+        ints = [int.from_bytes(key.tobytes(), "little") for key in keys]
+        np.testing.assert_array_equal(decode(ints), boards)
+        with self.assertRaises(ValueError):
+            decode([ints[0], Hasher(self.grid).key()])
+        with self.assertRaises(ValueError):
+            encode(np.full((1, 2, 2), 32))
+
+    def test_key_after_move(self):
+        """Test that the key does not follow later changes of the grid."""
+        hasher = Hasher(self.grid)
+        key = hasher.key()
+        self.grid.make_move(DIRECTION.LEFT)
+        self.assertEqual(hasher.key(), key)
+        self.assertEqual(hasher, Hasher.from_key(key))
+
+    def test_invalid(self):
+        """Test invalid grids and keys."""
+        with self.assertRaises(TypeError):
+            Hasher([1, 2])
+        with self.assertRaises(ValueError):
+            Hasher([[2, 4], [2]])
+        with self.assertRaises(ValueError):
+            Hasher(np.array([[3]]))
+        with self.assertRaises(ValueError):
+            Hasher(np.array([[2**32]])).key()
+        with self.assertRaises(ValueError):
+            Hasher.dehash(0)
+        with self.assertRaises(ValueError):
+            Hasher.dehash("0404")
+        with self.assertRaises(TypeError):
+            Hasher.dehash(1.5)
+
+    def test_text_keys(self):
+        """Test the text form of the keys and the strings of the old format."""
+        key = Hasher(self.grid).key()
+        self.assertEqual(parse_key(format_key(key)), key)
+        np.testing.assert_array_equal(Hasher.dehash(format_key(key)), self.data)
+        board = Hasher.dehash("23" + "102a00")
+        np.testing.assert_array_equal(board, [[2, 0, 4], [1024, 0, 0]])
+        board = Hasher.dehash("441234567890120001")
+        np.testing.assert_array_equal(board[0], [2, 4, 8, 16])
+        for text in ("0x12g", "23102a0", "4412345678901200010"):
+            with self.assertRaises(ValueError):
+                Hasher.dehash(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
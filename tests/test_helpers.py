@@ -1,7 +1,11 @@
 """Unit tests for the Grid2048 helper functions."""
 
+import os
+import tempfile
 import unittest
 import numpy as np
+from grid2048 import helpers
+from grid2048.bitboard import Bitboard2048
 from grid2048.grid2048 import Grid2048, DIRECTION, MoveFactory
 from grid2048.helpers import (
     get_valid_moves,
@@ -21,6 +25,7 @@ from grid2048.helpers import (
     count_vals_gte,
     zero_field,
     move_score,
+    edge_sum,
     max_tile,
     grid_sum,
     grid_size,
@@ -220,6 +225,80 @@ class TestHelpers(unittest.TestCase):
         self.assertEqual(move_score(self.empty_grid), 0)
         self.assertGreater(move_score(self.move_score_grid), 0)
 
+    def test_edge_sum(self):
+        """Test sum of the edge tiles."""
+        self.assertEqual(edge_sum(self.empty_grid), 0)
+        self.assertEqual(
+            edge_sum(self.test_grid), 2 + 4 + 8 + 16 + 2 + 16 + 8 + 4 + 2 + 2
+        )
+        grid = Grid2048(3, 2)
+        grid.data = np.array([[2, 4, 8], [16, 0, 2]])
+        self.assertEqual(edge_sum(grid), 14 + 18 + 18 + 10)
+
+    def test_row_heuristics(self):
+        """Test the precomputed row heuristics."""
+        table = helpers.get_row_heuristics()
+        row = 1 | 1 << 4 | 3 << 12  # [2, 2, 0, 8]
+        self.assertEqual(table.monotonicity[row], 0)
+        self.assertEqual(table.smoothness[row], 0)
+        self.assertEqual(table.empty[row], 1)
+        self.assertEqual(table.merge[row], 4)
+        self.assertEqual(table.edge[row], 12)
+
+        board = Bitboard2048()
+        board.data = self.test_grid.data
+        for heuristic in (monotonicity, smoothness, move_score, edge_sum):
+            self.assertEqual(heuristic(board), heuristic(self.test_grid))
+
+    def test_save_load_row_heuristics(self):
+        """Test saving and loading the row heuristics."""
+        table = helpers.get_row_heuristics()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rows.npz")
+            helpers.save_row_heuristics(path)
+            loaded = helpers.load_row_heuristics(path)
+        for saved, original in zip(loaded, table):
+            np.testing.assert_array_equal(saved, original)
+        self.assertIs(helpers.get_row_heuristics(), loaded)
+
+    def test_features(self):
+        """Test the fused feature vector."""
+        self.test_grid.score, self.test_grid.moves = 100, 10
+        vector = helpers.features(self.test_grid)
+        self.assertEqual(len(vector), len(helpers.FEATURES))
+        expected = {
+            "monotonicity": monotonicity(self.test_grid),
+            "smoothness": smoothness(self.test_grid),
+            "empty": 6 / 16,
+            "max_log": 4,
+            "high_on_edge_sqrt": high_vals_on_edge(self.test_grid, 8) ** 0.5,
+            "higher_on_edge_sqrt": higher_on_edge(self.test_grid) ** 0.5,
+            "values_mean": values_mean(self.test_grid),
+            "score_per_move": 10,
+            "sum_per_move": 5.2,
+        }
+        for name, value in expected.items():
+            self.assertAlmostEqual(vector[helpers.FEATURE_INDEX[name]], value)
+
+        weights = helpers.feature_weights(monotonicity=2, empty=1)
+        self.assertAlmostEqual(
+            vector @ weights, 2 * monotonicity(self.test_grid) + 6 / 16
+        )
+        with self.assertRaises(ValueError):
+            helpers.feature_weights(unknown=1)
+
+    def test_batch_features(self):
+        """Test that batched features match the features of every board."""
+        self.test_grid.score, self.test_grid.moves = 100, 10
+        grids = [self.empty_grid, self.test_grid]
+        boards = np.array([grid.exponents for grid in grids])
+        scores = np.array([grid.score for grid in grids])
+        moves = np.array([grid.moves for grid in grids])
+        batch = helpers.batch_features(boards, scores, moves)
+        self.assertEqual(batch.shape, (2, len(helpers.FEATURES)))
+        for row, grid in zip(batch, grids):
+            np.testing.assert_allclose(row, helpers.features(grid))
+
     def test_max_tile(self):
         """Test maximum tile calculation."""
         self.assertEqual(max_tile(self.empty_grid), 0)
@@ -245,6 +324,22 @@ class TestHelpers(unittest.TestCase):
         self.assertEqual(values_mean(self.empty_grid), 0)
         self.assertEqual(values_mean(self.test_grid), 5.2)  # 52/10 (10 non-zero values)
 
+    def test_rectangular_grid(self):
+        """Test the heuristics on a rectangular grid."""
+        grid = Grid2048(5, 3)
+        grid.data = np.array([[2, 2, 0, 4, 256], [4, 0, 0, 4, 2], [512, 8, 8, 0, 2]])
+        self.assertAlmostEqual(monotonicity(grid), 225 / 28)
+        self.assertAlmostEqual(smoothness(grid), 804 / 764)
+        self.assertAlmostEqual(pairs(grid), 1.2)
+        self.assertEqual(flatness(grid), 152.0)
+        self.assertEqual(high_vals_on_edge(grid), 51.2)
+        self.assertEqual(high_vals_in_corner(grid), 51.2)
+        self.assertEqual(higher_on_edge(grid), 104.0)
+        self.assertAlmostEqual(high_to_low(grid), 2 / 99)
+        self.assertAlmostEqual(low_to_high(grid), 9 / 22)
+        self.assertEqual(zero_field(grid), 0)
+        self.assertEqual(move_score(grid), 40)
+
 
 if __name__ == "__main__":
     unittest.main()
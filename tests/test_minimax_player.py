@@ -0,0 +1,101 @@
+"""Unit tests for the Minimax player."""
+
+import math
+import random
+import time
+import unittest
+
+from grid2048 import DIRECTION, Grid2048
+from players.minimax_player import MinimaxPlayer
+
+
+def alpha_beta(player, grid, alpha, beta, depth, maximizing):
+    """Plain fixed-depth alpha-beta search without table or move ordering"""
+    if depth == 0 or grid.no_moves:
+        return player.evaluate(grid)
+    if maximizing:
+        best_score = -math.inf
+        for direction in DIRECTION:
+            if not grid.make_move(direction):
+                continue
+            score = alpha_beta(player, grid, alpha, beta, depth - 1, False)
+            grid.unmake()
+            best_score = max(best_score, score)
+            alpha = max(alpha, score)
+            if beta <= alpha:
+                break
+        return best_score
+    empty_cells = grid.empty_cells.tolist()
+    if not empty_cells:
+        return alpha_beta(player, grid, alpha, beta, depth - 1, True)
+    best_score = math.inf
+    for cell in empty_cells:
+        for tile in player.tiles:
+            grid.make_tile(*divmod(cell, grid.width), tile)
+            score = alpha_beta(player, grid, alpha, beta, depth - 1, True)
+            grid.unmake()
+            best_score = min(best_score, score)
+            beta = min(beta, score)
+            if beta <= alpha:
+                return best_score
+    return best_score
+
+
+class TestMinimaxPlayer(unittest.TestCase):
+    """Test cases for the Minimax player."""
+
+    def setUp(self):
+        random.seed(0)
+        self.grids = []
+        for seed in range(3):
+            grid = Grid2048(4, 4, seed=seed)
+            for _ in range(10 * seed):
+                grid.move(random.choice(list(DIRECTION)))
+            self.grids.append(grid)
+
+    def root_scores(self, player, grid, depth):
+        """Return the exact score of every valid move"""
+        scores = {}
+        for direction in DIRECTION:
+            if grid.make_move(direction):
+                scores[direction] = alpha_beta(
+                    player, grid, -math.inf, math.inf, depth, True
+                )
+                grid.unmake()
+        return scores
+
+    def test_same_move_as_alpha_beta(self):
+        """Test that deepening and move ordering do not change the best move"""
+        for grid in self.grids:
+            player = MinimaxPlayer(grid)
+            player.depth = 3
+            scores = self.root_scores(player, grid, player.depth)
+            for _ in range(2):  # the second search starts with a filled table
+                move = player.get_best_move(grid)
+                self.assertEqual(scores[move], max(scores.values()))
+
+    def test_time_budget(self):
+        """Test that move_time limits the time per move"""
+        grid = self.grids[2]
+        for iterative in (True, False):
+            player = MinimaxPlayer(grid)
+            player.move_time = 0.05
+            player.iterative = iterative
+            start = time.monotonic()
+            move = player.get_best_move(grid)
+            self.assertLess(time.monotonic() - start, 0.5)
+            self.assertIn(move, DIRECTION)
+            # the search deepened from depth 1 instead of starting at max_depth
+            depth = player._root_depth  # pylint: disable=protected-access
+            self.assertLess(depth, player.max_depth)
+
+    def test_invalid_budget(self):
+        """Test that a non-positive move_time is rejected"""
+        player = MinimaxPlayer(self.grids[0])
+        player.move_time = 0
+        with self.assertRaises(ValueError):
+            player.get_best_move(self.grids[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Unit tests for the board symmetries."""
+
+import unittest
+
+import numpy as np
+from grid2048 import symmetry
+from grid2048.grid2048 import DIRECTION, Grid2048
+
+
+class TestSymmetry(unittest.TestCase):
+    """Test cases for the board symmetries."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.grid = Grid2048(4, 4)
+        self.grid.data = np.array(
+            [
+                [2, 0, 0, 2],
+                [2, 2, 0, 0],
+                [4, 0, 2, 0],
+                [0, 0, 0, 8],
+            ]
+        )
+
+    def test_transform_count(self):
+        """Test the number of symmetries of square and rectangular boards."""
+        self.assertEqual(len(symmetry.transforms(np.zeros((4, 4)))), 8)
+        self.assertEqual(len(symmetry.transforms(np.zeros((3, 5)))), 4)
+
+    def test_canonical_key(self):
+        """Test that all symmetric boards share the canonical key."""
+        key, transform = symmetry.canonical(self.grid)
+        self.assertEqual(symmetry.apply(self.grid.exponents, transform).tobytes(), key)
+        for t in symmetry.TRANSFORMS:
+            board = symmetry.apply(self.grid.exponents, t)
+            self.assertEqual(symmetry.canonical(board)[0], key)
+
+    def test_directions(self):
+        """Test that directions follow the transformed board."""
+        for t in symmetry.TRANSFORMS:
+            for direction in DIRECTION:
+                mapped = symmetry.transform_direction(direction, t)
+                self.assertEqual(symmetry.restore_direction(mapped, t), direction)
+                moved = Grid2048(4, 4)
+                moved.data = self.grid.data.copy()
+                moved.move(direction, add_tile=False)
+                other = Grid2048(4, 4)
+                other.data = np.ascontiguousarray(symmetry.apply(self.grid.data, t))
+                other.move(mapped, add_tile=False)
+                np.testing.assert_array_equal(
+                    symmetry.apply(moved.exponents, t), other.exponents
+                )
+                self.assertEqual(moved.score, other.score)
+
+    def test_rectangular_board(self):
+        """Test canonical keys of a rectangular board."""
+        board = np.array([[1, 2, 0], [0, 0, 3]])
+        key = symmetry.canonical(board)[0]
+        self.assertEqual(symmetry.canonical(board[::-1, ::-1])[0], key)
+        self.assertNotEqual(symmetry.canonical(board.T)[0], key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Unit tests for the row transition tables."""
+
+import unittest
+
+import numpy as np
+from grid2048 import tables
+from grid2048.grid2048 import DIRECTION, Grid2048, MoveFactory
+
+
+class TestTables(unittest.TestCase):
+    """Test cases for the row transition tables."""
+
+    def test_pack_round_trip(self):
+        """Test packing and unpacking rows of exponents."""
+        rows = np.array([[1, 0, 2, 3], [15, 15, 0, 1]])
+        np.testing.assert_array_equal(tables.unpack(tables.pack(rows), 4), rows)
+
+    def test_slide(self):
+        """Test sliding and merging rows of exponents."""
+        rows = np.array([[1, 1, 1, 1], [1, 0, 1, 2], [2, 1, 1, 0], [0, 0, 0, 3]])
+        new, score = tables.slide(rows)
+        expected = np.array([[2, 2, 0, 0], [2, 2, 0, 0], [2, 2, 0, 0], [3, 0, 0, 0]])
+        np.testing.assert_array_equal(new, expected)
+        np.testing.assert_array_equal(score, [8, 4, 4, 0])
+
+        new, score = tables.slide(rows, reverse=True)
+        np.testing.assert_array_equal(new[1], [0, 0, 2, 2])
+        self.assertEqual(score[2], 4)
+
+    def test_row_table(self):
+        """Test the tabulated transitions of a single row."""
+        table = tables.get_row_table(3)
+        row = tables.pack(np.array([1, 1, 2]))
+        np.testing.assert_array_equal(table.rows_left[row], [2, 2, 0])
+        np.testing.assert_array_equal(table.rows_right[row], [0, 2, 2])
+        self.assertEqual(table.score_left[row], 4)
+        self.assertTrue(table.changed_left[row])
+
+        row = tables.pack(np.array([3, 2, 1]))
+        self.assertFalse(table.changed_left[row])
+        self.assertFalse(table.changed_right[row])
+
+    def test_row_table_invalid_length(self):
+        """Test that too long rows are not tabulated."""
+        with self.assertRaises(ValueError):
+            tables.build_row_table(tables.MAX_LENGTH + 1)
+
+    def test_shift_rows(self):
+        """Test shifting rows through tables, memo and fallback."""
+        for rows in (
+            np.array([[1, 1, 2, 0], [0, 3, 0, 3]]),
+            np.array([[1, 1, 2, 0, 2, 2, 0]]),
+            np.array([[15, 15, 0, 1]]),
+        ):
+            expected, score = tables.slide(rows.copy())
+            new, total, changed = tables.shift_rows(rows)
+            np.testing.assert_array_equal(new, expected)
+            self.assertEqual(total, score.sum())
+            self.assertTrue(changed)
+
+    def test_table_length(self):
+        """Test that rows longer than the table length go through the bounded memo."""
+        rows = np.array([[1, 1, 2, 0, 2]])
+        expected, score = tables.slide(rows.copy())
+        new, total, _ = tables.shift_rows(rows)
+        np.testing.assert_array_equal(new, expected)
+        self.assertEqual(total, score.sum())
+        self.assertNotIn(5, tables._tables)  # pylint: disable=protected-access
+        self.assertLessEqual(tables._shift_row.cache_info().maxsize, tables.MEMO_SIZE)
+        with self.assertRaises(ValueError):
+            tables.set_table_length(tables.MAX_LENGTH + 1)
+
+    def test_non_square_grid(self):
+        """Test moves on a non-square grid."""
+        grid = Grid2048(3, 6)
+        grid.data = np.array(
+            [[2, 2, 0], [2, 0, 4], [0, 0, 4], [4, 0, 0], [0, 0, 0], [4, 2, 2]]
+        )
+        self.assertTrue(grid.move(MoveFactory.create(DIRECTION.UP), add_tile=False))
+        expected = np.array(
+            [[4, 4, 8], [8, 0, 2], [0, 0, 0], [0, 0, 0], [0, 0, 0], [0, 0, 0]]
+        )
+        np.testing.assert_array_equal(grid.data, expected)
+        self.assertEqual(grid.score, 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
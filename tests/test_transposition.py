@@ -0,0 +1,68 @@
+"""Unit tests for the transposition table of the search players."""
+
+import unittest
+
+import numpy as np
+from grid2048.grid2048 import DIRECTION, Grid2048
+from players.transposition import BOUND, TranspositionTable, position_key
+
+
+class TestTranspositionTable(unittest.TestCase):
+    """Test cases for the TranspositionTable class."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.grid = Grid2048(4, 4)
+        self.grid.data = np.array(
+            [
+                [2, 0, 0, 2],
+                [2, 2, 0, 0],
+                [4, 0, 2, 0],
+                [0, 0, 0, 4],
+            ]
+        )
+        self.table = TranspositionTable(16)
+
+    def test_position_key(self):
+        """Test that keys depend on the board, the score and the node type."""
+        key = position_key(self.grid)
+        self.assertNotEqual(position_key(self.grid, chance=True), key)
+        self.grid.make_move(DIRECTION.LEFT)
+        self.assertNotEqual(position_key(self.grid), key)
+        self.grid.unmake()
+        self.assertEqual(position_key(self.grid), key)
+        self.grid.score = 4
+        self.assertNotEqual(position_key(self.grid), key)
+        self.assertLess(key, 2**64)
+
+    def test_probe_and_store(self):
+        """Test that entries are found only for the same key and enough depth."""
+        key = position_key(self.grid)
+        self.assertIsNone(self.table.probe(key, 1))
+        self.table.store(key, 2, 1.5, move=DIRECTION.UP)
+        self.assertEqual(self.table.probe(key, 2), (1.5, 2, BOUND.EXACT, DIRECTION.UP))
+        self.assertEqual(self.table.probe(key, 1).value, 1.5)
+        self.assertIsNone(self.table.probe(key, 3))
+        self.assertIsNone(self.table.probe(key + 16, 1))
+        self.assertEqual(self.table.best_move(key), DIRECTION.UP)
+        self.assertEqual((self.table.hits, self.table.misses), (2, 3))
+        self.assertEqual(len(self.table), 1)
+
+    def test_replacement(self):
+        """Test that deeper entries are kept until the next search."""
+        self.table.store(1, 3, 1.0)
+        self.table.store(17, 1, 2.0)
+        self.assertEqual(self.table.probe(1, 3).value, 1.0)
+        self.table.store(17, 3, 2.0)
+        self.assertIsNone(self.table.probe(1, 1))
+        self.table.new_search()
+        self.table.store(1, 1, 3.0, BOUND.LOWER)
+        self.assertEqual(self.table.probe(1, 1), (3.0, 1, BOUND.LOWER, None))
+        self.table.clear()
+        self.assertEqual(len(self.table), 0)
+        with self.assertRaises(ValueError):
+            TranspositionTable(10)
+
+
+if __name__ == "__main__":
+    unittest.main()